@@ -1,16 +1,254 @@
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import quote
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+import uuid
 import httpx
 from mcp.server.fastmcp import FastMCP
 import os
 from dotenv import load_dotenv
 
+if find_spec("mcp_common") is None:
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+from mcp_common.ratelimit import RateLimiter
+
 load_dotenv()
 
 AIRTABLE_API_KEY = os.getenv("AIRTABLE_API_KEY")
 if not AIRTABLE_API_KEY:
     raise ValueError("AIRTABLE_API_KEY is not set in environment variables")
 
-mcp = FastMCP("airtable")
+# Connection pool settings for the shared Airtable client
+AIRTABLE_HTTP_MAX_CONNECTIONS = int(os.getenv("AIRTABLE_HTTP_MAX_CONNECTIONS", "20"))
+AIRTABLE_HTTP_MAX_KEEPALIVE = int(os.getenv("AIRTABLE_HTTP_MAX_KEEPALIVE", "10"))
+AIRTABLE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("AIRTABLE_HTTP_KEEPALIVE_EXPIRY", "30"))
+AIRTABLE_HTTP2 = os.getenv("AIRTABLE_HTTP2", "").lower() in ("1", "true", "yes")
+
+# Maximum concurrent view fetches while cloning linked views
+AIRTABLE_CLONE_CONCURRENCY = int(os.getenv("AIRTABLE_CLONE_CONCURRENCY", "8"))
+# Records read before a clone creates its base, so field types are
+# settled by more than the first page
+AIRTABLE_SCHEMA_SAMPLE_RECORDS = int(os.getenv("AIRTABLE_SCHEMA_SAMPLE_RECORDS", "1000"))
+
+# Write pipeline settings; Airtable allows 5 requests per second per base
+AIRTABLE_REQUESTS_PER_SECOND = float(os.getenv("AIRTABLE_REQUESTS_PER_SECOND", "5"))
+AIRTABLE_WRITE_CONCURRENCY = int(os.getenv("AIRTABLE_WRITE_CONCURRENCY", "4"))
+AIRTABLE_MAX_RETRIES = int(os.getenv("AIRTABLE_MAX_RETRIES", "5"))
+# Airtable asks clients to wait 30 seconds after a 429
+AIRTABLE_RATE_LIMIT_WAIT = 30.0
+
+# Attachment transfer settings used while cloning
+AIRTABLE_ATTACHMENT_CONCURRENCY = int(os.getenv("AIRTABLE_ATTACHMENT_CONCURRENCY", "4"))
+AIRTABLE_ATTACHMENT_MAX_BYTES_IN_FLIGHT = int(os.getenv("AIRTABLE_ATTACHMENT_MAX_BYTES_IN_FLIGHT", str(64 * 1024 * 1024)))
+# Read size for streamed files; a multiple of 3 so chunks base64-encode independently
+AIRTABLE_ATTACHMENT_CHUNK_SIZE = 3 * 64 * 1024
+# Largest file Airtable's uploadAttachment endpoint accepts
+AIRTABLE_UPLOAD_LIMIT = 5 * 1024 * 1024
+AIRTABLE_CONTENT_API = "https://content.airtable.com/v0"
+
+# SQLite journal recording clone job progress so jobs can be resumed
+AIRTABLE_JOURNAL_PATH = os.getenv(
+    "AIRTABLE_JOURNAL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "clone_jobs.sqlite3")
+)
+
+# Local SQLite mirror of Airtable tables for read-through queries
+AIRTABLE_MIRROR_PATH = os.getenv(
+    "AIRTABLE_MIRROR_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "record_mirror.sqlite3")
+)
+# Mirrors older than this many seconds are synced before being queried
+AIRTABLE_MIRROR_MAX_AGE = float(os.getenv("AIRTABLE_MIRROR_MAX_AGE", "300"))
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Own the shared Airtable client and local stores for the server's lifetime."""
+    get_client()
+    try:
+        yield
+    finally:
+        await close_client()
+        close_stores()
+
+mcp = FastMCP("airtable", lifespan=server_lifespan)
+
+def infer_value_type(value: Any) -> Optional[str]:
+    """Airtable field type suggested by a single value, or None if empty."""
+    if value is None or value == "" or value == []:
+        return None
+    # bool is a subclass of int, so it has to be checked first
+    if isinstance(value, bool):
+        return "checkbox"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "multilineText" if "\n" in value else "singleLineText"
+    if isinstance(value, dict) and "link" in value:
+        # A nested Airtable link that has been cloned in place
+        return "singleLineText"
+    if isinstance(value, list):
+        if all(isinstance(item, dict) and "url" in item for item in value):
+            return "multipleAttachments"
+        if all(isinstance(item, str) for item in value):
+            return "multipleSelects"
+    return "multilineText"
+
+# Inferred field types Airtable accepts for a table's primary field
+PRIMARY_FIELD_TYPES = ("singleLineText", "multilineText", "number")
+
+def join_field_types(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """Least general field type that can hold values of both types."""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    scalar = ("checkbox", "number", "singleLineText")
+    if a in scalar and b in scalar:
+        return "singleLineText"
+    return "multilineText"
+
+def text_value(value: Any) -> str:
+    """Text form of a value for a text field."""
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+def fit_value(field_type: Optional[str], value: Any) -> tuple:
+    """Fit a value to the type of a field that already exists.
+
+    Returns (value to write, overflow text). A value the field cannot hold,
+    e.g. text in a number field, is returned as overflow text instead.
+    """
+    value_type = infer_value_type(value)
+    if field_type is None or value_type is None:
+        return value, None
+    if field_type in ("singleLineText", "multilineText"):
+        text = text_value(value)
+        if field_type == "singleLineText" and "\n" in text:
+            return None, text
+        return text, None
+    if join_field_types(field_type, value_type) == field_type:
+        return value, None
+    return None, text_value(value)
+
+class SchemaInferencer:
+    """Single-pass field type inference over records as they stream in.
+
+    Every value is folded into its field's type with join_field_types, so
+    fields that are empty in early records are still picked up. Alongside
+    the type, each field tracks how many values agree with it (confidence)
+    and how many distinct values were seen (cardinality, up to a limit).
+    """
+
+    def __init__(self, cardinality_limit: int = 1000):
+        self.cardinality_limit = cardinality_limit
+        self.records = 0
+        self.fields: Dict[str, Dict[str, Any]] = {}
+
+    def add_records(self, records: List[Dict]) -> List[str]:
+        """Fold records into the schema, returning fields that are new or changed type."""
+        changed = []
+        for record in records:
+            self.records += 1
+            for name, value in record.get("fields", {}).items():
+                state = self.fields.get(name)
+                if state is None:
+                    state = self.fields[name] = {
+                        "type": None, "filled": 0, "types": {},
+                        "precision": 0, "values": set(), "choices": set()
+                    }
+                    changed.append(name)
+                value_type = infer_value_type(value)
+                if value_type is None:
+                    continue
+                state["filled"] += 1
+                state["types"][value_type] = state["types"].get(value_type, 0) + 1
+                joined = join_field_types(state["type"], value_type)
+                if joined != state["type"]:
+                    state["type"] = joined
+                    if name not in changed:
+                        changed.append(name)
+                if value_type == "number" and isinstance(value, float) and not value.is_integer():
+                    decimals = len(repr(value).partition(".")[2])
+                    state["precision"] = min(8, max(state["precision"], decimals))
+                if len(state["values"]) < self.cardinality_limit:
+                    state["values"].add(json.dumps(value, sort_keys=True, default=str))
+                if value_type == "multipleSelects":
+                    state["choices"].update(value)
+        return changed
+
+    def field(self, name: str) -> Dict:
+        """Airtable field definition for a field."""
+        state = self.fields[name]
+        field_type = state["type"] or "singleLineText"
+        field = {"name": name, "type": field_type}
+        if field_type == "number":
+            field["options"] = {"precision": state["precision"]}
+        elif field_type == "checkbox":
+            field["options"] = {"icon": "check", "color": "greenBright"}
+        elif field_type == "multipleSelects":
+            field["options"] = {"choices": [{"name": choice} for choice in sorted(state["choices"])]}
+        return field
+
+    def schema(self, name: Optional[str] = None) -> Dict:
+        """Airtable table definition covering every field seen so far.
+
+        The first field becomes the primary field, so the first field of a
+        type Airtable allows there is moved to the front; if there is none,
+        a "Name" text field is added for it.
+        """
+        fields = [self.field(field_name) for field_name in self.fields]
+        primary = next((i for i, field in enumerate(fields) if field["type"] in PRIMARY_FIELD_TYPES), None)
+        if primary is not None:
+            fields.insert(0, fields.pop(primary))
+        else:
+            names = {field["name"] for field in fields}
+            primary_name = "Name"
+            while primary_name in names:
+                primary_name += " (primary)"
+            fields.insert(0, {"name": primary_name, "type": "singleLineText"})
+        schema = {"fields": fields}
+        if name is not None:
+            schema["name"] = name
+        return schema
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-field type, confidence, fill rate and observed cardinality."""
+        stats = {}
+        for name, state in self.fields.items():
+            field_type = state["type"] or "singleLineText"
+            agreeing = state["types"].get(field_type, 0)
+            if field_type == "multilineText":
+                agreeing += state["types"].get("singleLineText", 0)
+            stats[name] = {
+                "type": field_type,
+                "confidence": round(agreeing / state["filled"], 3) if state["filled"] else 0.0,
+                "filled": state["filled"],
+                "records": self.records,
+                "cardinality": len(state["values"]),
+                "cardinality_capped": len(state["values"]) >= self.cardinality_limit
+            }
+        return stats
+
+BASE_ID = re.compile(r"\bapp[A-Za-z0-9]{14}\b")
+
+def rate_limit_key(url: str) -> str:
+    """Key a request is rate limited under: its base id, else its host.
+
+    Airtable's limit is per base, so reads, writes and meta calls for a
+    base share one budget.
+    """
+    parsed = httpx.URL(url)
+    match = BASE_ID.search(parsed.path)
+    return match.group(0) if match else parsed.host
 
 class AirtableClient:
     def __init__(self):
@@ -20,63 +258,338 @@ class AirtableClient:
             headers={
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
-            }
+            },
+            limits=httpx.Limits(
+                max_connections=AIRTABLE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=AIRTABLE_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=AIRTABLE_HTTP_KEEPALIVE_EXPIRY
+            ),
+            http2=AIRTABLE_HTTP2 and find_spec("h2") is not None
         )
         self.max_depth = 3
+        self.concurrency = AIRTABLE_CLONE_CONCURRENCY
+        self.write_concurrency = AIRTABLE_WRITE_CONCURRENCY
+        # Requests are limited per base, as Airtable does (see rate_limit_key)
+        self.limiter = RateLimiter(
+            AIRTABLE_REQUESTS_PER_SECOND,
+            max_concurrency=AIRTABLE_HTTP_MAX_CONNECTIONS,
+            max_retries=AIRTABLE_MAX_RETRIES,
+            backoff_base=1.0,
+            throttle_wait=AIRTABLE_RATE_LIMIT_WAIT
+        )
         self.api_base = "https://api.airtable.com/v0"
-        
-    async def create_base(self, name: str, tables: List[Dict]) -> str:
-        """Create a new Airtable base"""
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its pooled connections."""
+        await self.client.aclose()
+
+    async def create_base(self, name: str, tables: List[Dict]) -> Dict:
+        """Create a new Airtable base, returning its id and tables"""
         url = "https://api.airtable.com/v0/meta/bases"
         payload = {
             "name": name,
             "tables": tables
         }
-        response = await self.client.post(url, json=payload)
+        response = await self._request("POST", url, json=payload)
         response.raise_for_status()
-        return response.json()["id"]
+        return response.json()
 
     async def create_table(self, base_id: str, table_data: Dict) -> str:
         """Create a new table in the base"""
         url = f"https://api.airtable.com/v0/meta/bases/{base_id}/tables"
-        response = await self.client.post(url, json=table_data)
+        response = await self._request("POST", url, json=table_data)
+        response.raise_for_status()
+        return response.json()["id"]
+
+    async def create_field(self, base_id: str, table_id: str, field: Dict) -> str:
+        """Create a new field in a table"""
+        url = f"https://api.airtable.com/v0/meta/bases/{base_id}/tables/{table_id}/fields"
+        response = await self._request("POST", url, json=field)
         response.raise_for_status()
         return response.json()["id"]
 
-    async def insert_records(self, base_id: str, table_id: str, records: List[Dict]) -> None:
-        """Insert records into a table"""
+    async def insert_records(self, base_id: str, table_id: str, records: List[Dict]) -> Dict[str, Any]:
+        """Insert records into a table.
+
+        Batches are written by several concurrent workers, paced by the
+        base's rate limit. Returns throughput statistics for the load.
+        """
+        async def pages() -> AsyncIterator[List[Dict]]:
+            yield records
+
+        return await self.insert_record_stream(base_id, table_id, pages())
+
+    async def insert_record_stream(
+        self,
+        base_id: str,
+        table_id: str,
+        pages: AsyncIterator[List[Dict]],
+        skip_batch: Optional[Callable[[int, int], bool]] = None,
+        on_batch_written: Optional[Callable[[int, int, Dict], None]] = None,
+        merge_fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Insert records into a table as pages of them arrive.
+
+        Pages are split into batches on a bounded queue, so reading stops
+        while the writers are behind and memory stays flat. Batches are
+        identified by (page number, batch number) for the optional
+        skip_batch and on_batch_written hooks; the latter also receives the
+        response body with the written records. With merge_fields, batches
+        are upserted on those fields instead of inserted.
+        """
         url = f"{self.api_base}/{base_id}/{table_id}"
-        # Batch records in groups of 10 (Airtable limit)
-        for i in range(0, len(records), 10):
-            batch = records[i:i+10]
-            payload = {"records": batch}
-            response = await self.client.post(url, json=payload)
+        method, extra_payload = "POST", {}
+        if merge_fields:
+            method, extra_payload = "PATCH", {"performUpsert": {"fieldsToMergeOn": merge_fields}}
+        started = time.monotonic()
+        workers_count = max(1, self.write_concurrency)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers_count * 2)
+        counts = {"records": 0, "batches": 0}
+
+        async def producer() -> None:
+            try:
+                page_number = 0
+                async for page in pages:
+                    # Batch records in groups of 10 (Airtable limit)
+                    for i in range(0, len(page), 10):
+                        if skip_batch and skip_batch(page_number, i // 10):
+                            continue
+                        await queue.put((page_number, i // 10, page[i:i+10]))
+                    page_number += 1
+            finally:
+                # Release the page source even when cancelled mid-stream
+                aclose = getattr(pages, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            # Sentinels only on a clean finish; on failure the workers are
+            # cancelled, and a full queue would block these puts forever
+            for _ in range(workers_count):
+                await queue.put(None)
+
+        async def worker() -> None:
+            while (item := await queue.get()) is not None:
+                page_number, batch_number, batch = item
+                response = await self._write(method, base_id, url, {"records": batch, "typecast": True, **extra_payload})
+                counts["records"] += len(batch)
+                counts["batches"] += 1
+                if on_batch_written:
+                    on_batch_written(page_number, batch_number, response.json())
+
+        tasks = [asyncio.ensure_future(producer())]
+        tasks += [asyncio.ensure_future(worker()) for _ in range(workers_count)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        elapsed = time.monotonic() - started
+        return {
+            "records": counts["records"],
+            "batches": counts["batches"],
+            "seconds": round(elapsed, 3),
+            "records_per_second": round(counts["records"] / elapsed, 1) if elapsed > 0 else None
+        }
+
+    async def upsert_records(
+        self,
+        base_id: str,
+        table_id: str,
+        records: List[Dict],
+        merge_fields: List[str],
+        hashes: Optional["ContentHashStore"] = None
+    ) -> Dict[str, Any]:
+        """Upsert records matched on merge_fields, skipping unchanged ones.
+
+        When a hash store is given, records whose content hash matches the
+        one stored at their last successful write are not sent at all.
+        """
+        records = [{"fields": r["fields"] if "fields" in r else r} for r in records]
+        changed, digests = records, {}
+        if hashes is not None:
+            changed, digests = hashes.changed(base_id, table_id, merge_fields, records)
+
+        def batch_written(page_number: int, batch_number: int, body: Dict) -> None:
+            if hashes is not None:
+                hashes.store(base_id, table_id, [
+                    digests[id(record)] for record in changed[batch_number * 10:batch_number * 10 + 10]
+                ])
+
+        async def pages() -> AsyncIterator[List[Dict]]:
+            yield changed
+
+        stats = await self.insert_record_stream(
+            base_id, table_id, pages(),
+            on_batch_written=batch_written,
+            merge_fields=merge_fields
+        )
+        stats["unchanged"] = len(records) - len(changed)
+        return stats
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request under the rate limit of the base it targets."""
+        return await self.limiter.send(
+            rate_limit_key(url),
+            lambda: self.client.request(method, url, **kwargs),
+            idempotent=method != "POST"
+        )
+
+    async def _write(self, method: str, base_id: str, url: str, payload: Dict) -> httpx.Response:
+        """Send a write request under the base's rate limit, retrying 429s (and 5xx errors unless it is a POST)."""
+        response = await self.limiter.send(
+            base_id,
+            lambda: self.client.request(method, url, json=payload),
+            idempotent=method != "POST"
+        )
+        response.raise_for_status()
+        return response
+
+    async def link_attachments(
+        self,
+        base_id: str,
+        table_id: str,
+        record_id: str,
+        field: str,
+        attachments: List[Dict],
+        keep_existing: bool = False
+    ) -> None:
+        """Set attachments by URL so Airtable fetches the files itself.
+
+        Setting the field replaces what it holds; with keep_existing the
+        attachments already in it are passed back by id and kept.
+        """
+        url = f"{self.api_base}/{base_id}/{table_id}/{record_id}"
+        files = [{"url": a["url"], "filename": a.get("filename")} for a in attachments]
+        if keep_existing:
+            response = await self._request("GET", url)
             response.raise_for_status()
+            existing = response.json().get("fields", {}).get(field) or []
+            files = [{"id": a["id"]} for a in existing] + files
+        await self._write("PATCH", base_id, url, {"fields": {field: files}, "typecast": True})
+
+    async def stream_attachment(self, base_id: str, record_id: str, field: str, attachment: Dict) -> int:
+        """Copy one file from its source URL into a record's attachment field.
+
+        The download is re-encoded to base64 and sent as the upload body
+        chunk by chunk, so memory use does not depend on the file size.
+        Returns the number of bytes transferred.
+        """
+        url = f"{AIRTABLE_CONTENT_API}/{base_id}/{record_id}/{quote(field, safe='')}/uploadAttachment"
+        transferred = 0
+
+        async def upload() -> httpx.Response:
+            nonlocal transferred
+            # Attachment URLs are pre-signed; don't send them our API key
+            download = self.client.build_request("GET", attachment["url"])
+            download.headers.pop("Authorization", None)
+            source = await self.client.send(download, stream=True)
+            try:
+                source.raise_for_status()
+                transferred = 0
+
+                async def body() -> AsyncIterator[bytes]:
+                    nonlocal transferred
+                    header = json.dumps({
+                        "contentType": attachment.get("type") or source.headers.get("Content-Type", "application/octet-stream"),
+                        "filename": attachment.get("filename") or "file"
+                    })
+                    yield header[:-1].encode() + b', "file": "'
+                    remainder = b""
+                    async for chunk in source.aiter_bytes(AIRTABLE_ATTACHMENT_CHUNK_SIZE):
+                        transferred += len(chunk)
+                        data = remainder + chunk
+                        cut = len(data) - len(data) % 3
+                        yield base64.b64encode(data[:cut])
+                        remainder = data[cut:]
+                    yield base64.b64encode(remainder) + b'"}'
+
+                return await self.client.post(url, content=body())
+            finally:
+                await source.aclose()
+
+        # Each attempt re-downloads the file, since the body is streamed
+        response = await self.limiter.send(base_id, upload, idempotent=False)
+        response.raise_for_status()
+        return transferred
+
+    async def iter_view_pages(
+        self,
+        url: str,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        offset: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """Yield each page of a view, following Airtable's offset pagination."""
+        semaphore = semaphore or asyncio.Semaphore(self.concurrency)
+        while True:
+            async with semaphore:
+                response = await self._request("GET", url, params={"offset": offset} if offset else None)
+                response.raise_for_status()
+                data = response.json()
+            yield data
+            offset = data.get("offset")
+            if not offset:
+                break
+
+    async def iter_table_records(self, base_id: str, table_id: str, formula: Optional[str] = None) -> AsyncIterator[List[Dict]]:
+        """Yield pages of records from a table, optionally filtered by a formula."""
+        params = {"pageSize": 100}
+        if formula:
+            params["filterByFormula"] = formula
+        url = str(httpx.URL(f"{self.api_base}/{base_id}/{table_id}", params=params))
+        async for data in self.iter_view_pages(url):
+            yield data.get("records", [])
+
+    def _new_clone_state(self) -> Dict:
+        return {
+            "tasks": {},
+            "waits": {},
+            "streaming": set(),
+            "semaphore": asyncio.Semaphore(self.concurrency)
+        }
+
+    async def iter_cloned_pages(
+        self,
+        url: str,
+        current_depth: int = 0,
+        state: Optional[Dict] = None,
+        offset: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """Yield each page of a view with its nested Airtable links cloned."""
+        state = state if state is not None else self._new_clone_state()
+        state["streaming"].add(url)
+        try:
+            async for data in self.iter_view_pages(url, state["semaphore"], offset):
+                await self._clone_links(url, data.get("records", []), current_depth, state)
+                yield data
+        finally:
+            state["streaming"].discard(url)
 
     async def fetch_and_clone_view(self, url: str, current_depth: int = 0) -> Dict[str, Any]:
-        """Recursively fetch view data and clone structure"""
+        """Recursively fetch view data and clone structure.
+
+        Linked views are fetched concurrently (at most self.concurrency
+        requests at a time), each URL is fetched once per clone, and links
+        that lead back into a view still being cloned are reported as cycles.
+        """
+        state = self._new_clone_state()
+        task = asyncio.ensure_future(self._clone_view(url, current_depth, state))
+        state["tasks"][url] = task
+        return await task
+
+    async def _clone_view(self, url: str, current_depth: int, state: Dict) -> Dict[str, Any]:
         if current_depth >= self.max_depth:
             return {"message": "Max depth reached", "data": None}
 
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-            # Extract schema and records
-            schema = self._extract_schema(data)
-            records = data.get("records", [])
-
-            # Process nested Airtable links
-            for record in records:
-                for field, value in record.get("fields", {}).items():
-                    if isinstance(value, str) and "airtable.com" in value:
-                        nested_data = await self.fetch_and_clone_view(value, current_depth + 1)
-                        if nested_data:
-                            record["fields"][field] = {
-                                "link": value,
-                                "cloned_data": nested_data
-                            }
+            records = []
+            inferencer = SchemaInferencer()
+            async for data in self.iter_cloned_pages(url, current_depth, state):
+                # Extract schema and records
+                inferencer.add_records(data.get("records", []))
+                records.extend(data.get("records", []))
+            schema = inferencer.schema()
 
             return {
                 "schema": schema,
@@ -86,26 +599,846 @@ class AirtableClient:
         except Exception as e:
             return {"error": str(e)}
 
-    def _extract_schema(self, data: Dict) -> Dict:
-        """Extract table schema from view data"""
+    async def _clone_links(self, url: str, records: List[Dict], current_depth: int, state: Dict) -> None:
+        """Replace nested Airtable links in records with their cloned data."""
+        links = [
+            (record, field, value)
+            for record in records
+            for field, value in record.get("fields", {}).items()
+            if isinstance(value, str) and "airtable.com" in value
+        ]
+        nested = await asyncio.gather(*(
+            self._clone_linked_view(url, value, current_depth + 1, state)
+            for _, _, value in links
+        ))
+        for (record, field, value), nested_data in zip(links, nested):
+            if nested_data:
+                record["fields"][field] = {
+                    "link": value,
+                    "cloned_data": nested_data
+                }
+
+    async def _clone_linked_view(self, parent: str, url: str, current_depth: int, state: Dict) -> Dict[str, Any]:
+        """Clone a linked view once per clone, sharing the result between links."""
+        tasks, waits = state["tasks"], state["waits"]
+        task = tasks.get(url)
+        if task is None:
+            if url in state["streaming"]:
+                # A link back to the top-level view being streamed
+                return {"message": "Cycle detected", "link": url}
+            task = asyncio.ensure_future(self._clone_view(url, current_depth, state))
+            tasks[url] = task
+        elif not task.done() and self._waits_on(waits, url, parent):
+            # url is (indirectly) waiting on parent, so awaiting it would deadlock
+            return {"message": "Cycle detected", "link": url}
+
+        waits.setdefault(parent, set()).add(url)
+        try:
+            return await task
+        finally:
+            waits[parent].discard(url)
+
+    @staticmethod
+    def _waits_on(waits: Dict[str, set], start: str, target: str) -> bool:
+        """Check whether start transitively waits on target."""
+        stack, seen = [start], set()
+        while stack:
+            current = stack.pop()
+            if current == target:
+                return True
+            if current not in seen:
+                seen.add(current)
+                stack.extend(waits.get(current, ()))
+        return False
+
+    @staticmethod
+    def _record_for_write(record: Dict, attachments: Optional[Dict[str, List[Dict]]] = None) -> Dict:
+        """Strip a fetched record down to writable fields.
+
+        If an attachments dict is given, attachment fields are moved into it
+        instead of being written with the record.
+        """
         fields = {}
-        if data.get("records"):
-            sample_record = data["records"][0]
-            for field, value in sample_record.get("fields", {}).items():
-                fields[field] = self._infer_field_type(value)
+        for field, value in record.get("fields", {}).items():
+            if attachments is not None and infer_value_type(value) == "multipleAttachments":
+                attachments[field] = value
+            else:
+                fields[field] = value
         return {"fields": fields}
 
-    def _infer_field_type(self, value: Any) -> Dict:
-        """Infer Airtable field type from value"""
-        if isinstance(value, str):
-            return {"type": "singleLineText"}
-        elif isinstance(value, (int, float)):
-            return {"type": "number"}
-        elif isinstance(value, bool):
-            return {"type": "checkbox"}
-        elif isinstance(value, list):
-            return {"type": "multipleAttachments"}
-        return {"type": "singleLineText"}
+class ByteBudget:
+    """Admits work while the total bytes in flight stay within a budget.
+
+    A single item larger than the budget is still admitted once nothing
+    else is in flight, so big files run alone instead of starving.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size: int) -> None:
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.in_flight == 0 or self.in_flight + size <= self.max_bytes
+            )
+            self.in_flight += size
+
+    async def release(self, size: int) -> None:
+        async with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+class AttachmentTransfer:
+    """Copies attachments into cloned records alongside the record writes.
+
+    Files within Airtable's upload limit are streamed from their source URL
+    into the destination record in chunks. Larger files, or files of
+    unknown size, are handed to Airtable by URL so it fetches them itself.
+    Transfers are bounded both by count and by bytes in flight. The
+    optional on_progress hook is called with (record_id, field, remaining
+    attachments, error) whenever a field's remaining files change and
+    once its transfer ends, so callers can journal what is left to do.
+    """
+
+    def __init__(
+        self,
+        client: "AirtableClient",
+        base_id: str,
+        table_id: str,
+        on_progress: Optional[Callable[[str, str, List[Dict], Optional[str]], None]] = None
+    ):
+        self.client = client
+        self.base_id = base_id
+        self.table_id = table_id
+        self.on_progress = on_progress
+        self.slots = asyncio.Semaphore(AIRTABLE_ATTACHMENT_CONCURRENCY)
+        self.budget = ByteBudget(AIRTABLE_ATTACHMENT_MAX_BYTES_IN_FLIGHT)
+        self.tasks: List[asyncio.Task] = []
+        self.stats = {"files": 0, "uploaded": 0, "linked": 0, "failed": 0, "bytes": 0, "errors": []}
+
+    def submit(self, record_id: str, field: str, attachments: List[Dict], retry: bool = False) -> None:
+        """Schedule copying a field's attachments into a written record.
+
+        A retry may find some of the field's files already copied, so
+        linking keeps the attachments the field holds.
+        """
+        self.stats["files"] += len(attachments)
+        self.tasks.append(asyncio.ensure_future(self._transfer_field(record_id, field, attachments, retry)))
+
+    async def _transfer_field(self, record_id: str, field: str, attachments: List[Dict], retry: bool) -> None:
+        small, large = [], []
+        for attachment in attachments:
+            fits = 0 < (attachment.get("size") or 0) <= AIRTABLE_UPLOAD_LIMIT
+            (small if fits else large).append(attachment)
+        remaining = list(attachments)
+        errors = []
+
+        def done(copied: List[Dict]) -> None:
+            for attachment in copied:
+                remaining.remove(attachment)
+            if self.on_progress:
+                self.on_progress(record_id, field, remaining, None)
+
+        try:
+            # Setting the field by URL replaces it, so do that before
+            # uploads, which append to the field
+            if large:
+                async with self.slots:
+                    await self.client.link_attachments(
+                        self.base_id, self.table_id, record_id, field, large, keep_existing=retry
+                    )
+                self.stats["linked"] += len(large)
+                done(large)
+        except Exception as e:
+            self._failed(len(large), e)
+            errors.append(str(e))
+
+        async def upload(attachment: Dict) -> None:
+            try:
+                await self._upload(record_id, field, attachment)
+                done([attachment])
+            except Exception as e:
+                errors.append(str(e))
+
+        await asyncio.gather(*(upload(a) for a in small))
+        if errors and self.on_progress:
+            self.on_progress(record_id, field, remaining, errors[0])
+
+    async def _upload(self, record_id: str, field: str, attachment: Dict) -> None:
+        size = attachment["size"]
+        await self.budget.acquire(size)
+        try:
+            async with self.slots:
+                transferred = await self.client.stream_attachment(self.base_id, record_id, field, attachment)
+            self.stats["bytes"] += transferred
+            self.stats["uploaded"] += 1
+        except Exception as e:
+            self._failed(1, e)
+            raise
+        finally:
+            await self.budget.release(size)
+
+    def _failed(self, count: int, error: Exception) -> None:
+        self.stats["failed"] += count
+        if len(self.stats["errors"]) < 5:
+            self.stats["errors"].append(str(error))
+
+    async def join(self) -> Dict[str, Any]:
+        """Wait for every scheduled transfer and return transfer statistics."""
+        await asyncio.gather(*self.tasks)
+        return self.stats
+
+    def cancel(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+class CloneJournal:
+    """SQLite journal of clone jobs and their progress.
+
+    A job records the base and table it created, the field definitions
+    created so far, the offset of the first page not yet fully written and
+    which batches of the pages after it have been acknowledged, so an
+    interrupted clone can continue without re-reading or re-writing
+    finished work. Batches are also recorded by page number, since page
+    offsets expire and a resumed job may have to paginate afresh.
+    Attachment transfers are journaled with their acknowledged batch and
+    trimmed as files are copied, so a resume retries whatever is left.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    base_name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    base_id TEXT,
+                    table_id TEXT,
+                    fields TEXT NOT NULL DEFAULT '[]',
+                    page_offset TEXT,
+                    pages_done INTEGER NOT NULL DEFAULT 0,
+                    records_written INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS batches (
+                    job_id TEXT NOT NULL,
+                    page_offset TEXT NOT NULL,
+                    batch INTEGER NOT NULL,
+                    records INTEGER NOT NULL,
+                    page_number INTEGER,
+                    PRIMARY KEY (job_id, page_offset, batch)
+                );
+                CREATE TABLE IF NOT EXISTS transfers (
+                    job_id TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    attachments TEXT NOT NULL,
+                    error TEXT,
+                    PRIMARY KEY (job_id, record_id, field)
+                );
+            """)
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(batches)")}
+            if "page_number" not in columns:
+                self.conn.execute("ALTER TABLE batches ADD COLUMN page_number INTEGER")
+
+    def create_job(self, url: str, base_name: str) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs (id, url, base_name, status, created_at, updated_at) VALUES (?, ?, ?, 'running', ?, ?)",
+                (job_id, url, base_name, now, now)
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["fields"] = json.loads(job["fields"])
+        job["acknowledged_batches"] = self.conn.execute(
+            "SELECT COUNT(*) FROM batches WHERE job_id = ?", (job_id,)
+        ).fetchone()[0]
+        transfers = self.pending_transfers(job_id)
+        job["pending_transfers"] = len(transfers)
+        job["pending_files"] = sum(len(transfer["attachments"]) for transfer in transfers)
+        job["failed_transfers"] = sum(1 for transfer in transfers if transfer["error"])
+        return job
+
+    def update_job(self, job_id: str, **values: Any) -> None:
+        if "fields" in values:
+            values["fields"] = json.dumps(values["fields"])
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self.conn:
+            self.conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values.values(), job_id))
+
+    def acknowledged_batches(self, job_id: str, page_offset: str, page_number: int) -> set:
+        rows = self.conn.execute(
+            "SELECT batch FROM batches WHERE job_id = ? AND (page_offset = ? OR page_number = ?)",
+            (job_id, page_offset, page_number)
+        )
+        return {row[0] for row in rows}
+
+    def acknowledge_batch(
+        self,
+        job_id: str,
+        page_offset: str,
+        page_number: int,
+        batch: int,
+        records: int,
+        transfers: List[tuple] = ()
+    ) -> None:
+        """Record a written batch with the (record_id, field, attachments) it still needs copied."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO batches (job_id, page_offset, page_number, batch, records) VALUES (?, ?, ?, ?, ?)",
+                (job_id, page_offset, page_number, batch, records)
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO transfers (job_id, record_id, field, attachments) VALUES (?, ?, ?, ?)",
+                [(job_id, record_id, field, json.dumps(attachments)) for record_id, field, attachments in transfers]
+            )
+            self.conn.execute(
+                "UPDATE jobs SET records_written = records_written + ?, updated_at = ? WHERE id = ?",
+                (records, time.time(), job_id)
+            )
+
+    def pending_transfers(self, job_id: str) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT record_id, field, attachments, error FROM transfers WHERE job_id = ?", (job_id,)
+        )
+        return [
+            {"record_id": row[0], "field": row[1], "attachments": json.loads(row[2]), "error": row[3]}
+            for row in rows
+        ]
+
+    def update_transfer(self, job_id: str, record_id: str, field: str, attachments: List[Dict], error: Optional[str]) -> None:
+        """Record what is left of a transfer, dropping it once nothing is."""
+        with self.conn:
+            if attachments:
+                self.conn.execute(
+                    "UPDATE transfers SET attachments = ?, error = ? WHERE job_id = ? AND record_id = ? AND field = ?",
+                    (json.dumps(attachments), error, job_id, record_id, field)
+                )
+            else:
+                self.conn.execute(
+                    "DELETE FROM transfers WHERE job_id = ? AND record_id = ? AND field = ?",
+                    (job_id, record_id, field)
+                )
+
+    def complete_page(self, job_id: str, page_offset: str, page_number: int, next_offset: Optional[str]) -> None:
+        """Move the resume point past a page whose batches are all written."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM batches WHERE job_id = ? AND (page_offset = ? OR page_number = ?)",
+                (job_id, page_offset, page_number)
+            )
+            self.conn.execute(
+                "UPDATE jobs SET page_offset = ?, pages_done = pages_done + 1, updated_at = ? WHERE id = ?",
+                (next_offset, time.time(), job_id)
+            )
+
+# Ids of clone jobs running in this process; a second run of the same job
+# would write its unacknowledged batches twice
+active_clone_jobs: set = set()
+
+async def run_clone_job(client: AirtableClient, journal: CloneJournal, job_id: str) -> Dict[str, Any]:
+    """Run (or continue) a clone job, journaling progress as batches are written."""
+    if job_id in active_clone_jobs:
+        raise RuntimeError(f"Clone job {job_id} is already running")
+    active_clone_jobs.add(job_id)
+    try:
+        return await _run_clone_job(client, journal, job_id)
+    finally:
+        active_clone_jobs.discard(job_id)
+
+def journaled_transfer(
+    client: AirtableClient,
+    journal: CloneJournal,
+    job_id: str,
+    base_id: str,
+    table_id: str
+) -> AttachmentTransfer:
+    """Attachment transfer for a job that journals its progress, with
+    transfers left over from earlier runs already resubmitted."""
+    transfer = AttachmentTransfer(
+        client, base_id, table_id,
+        on_progress=lambda record_id, field, remaining, error: journal.update_transfer(
+            job_id, record_id, field, remaining, error
+        )
+    )
+    for pending in journal.pending_transfers(job_id):
+        transfer.submit(pending["record_id"], pending["field"], pending["attachments"], retry=True)
+    return transfer
+
+async def _run_clone_job(client: AirtableClient, journal: CloneJournal, job_id: str) -> Dict[str, Any]:
+    job = journal.get_job(job_id)
+    base_name = job["base_name"]
+    if job["pages_done"] and job["page_offset"] is None:
+        # Every page was written before the job stopped; only attachment
+        # transfers may be left
+        transfer = journaled_transfer(client, journal, job_id, job["base_id"], job["table_id"])
+        attachment_stats = await transfer.join()
+        journal.update_job(job_id, status="completed", error=None)
+        return {
+            "message": "Base created successfully",
+            "job_id": job_id,
+            "base_id": job["base_id"],
+            "attachment_stats": attachment_stats,
+            "pending_transfers": journal.get_job(job_id)["pending_transfers"]
+        }
+    journal.update_job(job_id, status="running", error=None)
+
+    # Stream the view page by page, starting from the first page that was
+    # not completely written. Links to other views are copied as URLs;
+    # their contents are not read.
+    start_offset = job["page_offset"]
+    # Offset that fetched the first page read, and that page's number
+    resume_offset = start_offset
+    first_page = job["pages_done"]
+
+    async def view_pages() -> AsyncIterator[Dict]:
+        nonlocal resume_offset
+        source = client.iter_view_pages(job["url"], offset=start_offset)
+        if start_offset is not None:
+            try:
+                first = await anext(source)
+            except httpx.HTTPStatusError as e:
+                # Airtable page offsets expire, so after a long pause read
+                # the view from the start and skip the pages already written
+                if e.response.status_code != 422:
+                    raise
+                source = client.iter_view_pages(job["url"])
+                resume_offset = None
+                for _ in range(first_page):
+                    skipped = await anext(source, None)
+                    if skipped is None:
+                        return
+                    resume_offset = skipped.get("offset")
+                    if resume_offset is None:
+                        return
+            else:
+                yield first
+        async for page in source:
+            yield page
+
+    pages = view_pages()
+
+    # Read ahead so the base is created from a sample of records rather
+    # than the first page; the inferencer keeps folding in later pages
+    inferencer = SchemaInferencer()
+    buffered = []
+    sampled = 0
+    async for page in pages:
+        buffered.append(page)
+        inferencer.add_records(page.get("records", []))
+        sampled += len(page.get("records", []))
+        if job["base_id"] is not None or sampled >= AIRTABLE_SCHEMA_SAMPLE_RECORDS:
+            break
+
+    if job["base_id"] is None:
+        schema = inferencer.schema(base_name)
+        base = await client.create_base(base_name, [schema])
+        # Get the first table ID from the new base
+        job["base_id"] = base["id"]
+        job["table_id"] = base["tables"][0]["id"]
+        job["fields"] = schema["fields"]
+        journal.update_job(job_id, base_id=job["base_id"], table_id=job["table_id"], fields=job["fields"])
+    base_id, table_id = job["base_id"], job["table_id"]
+
+    # Field definitions as created in the base. Types cannot be changed
+    # once records are written, so later values are fitted to them.
+    # Jobs journaled before definitions were stored only have names.
+    created: Dict[str, Dict] = {}
+    for field in job["fields"]:
+        if isinstance(field, str):
+            field = {"name": field, "type": None}
+        created[field["name"]] = field
+    conflicts: Dict[str, int] = {}
+
+    async def ensure_field(field: Dict) -> None:
+        if field["name"] not in created:
+            await client.create_field(base_id, table_id, field)
+            created[field["name"]] = field
+            journal.update_job(job_id, fields=list(created.values()))
+
+    async def ensure_fields() -> None:
+        # Fields first seen on a later page are added before writing it
+        for name in inferencer.fields:
+            if name not in created:
+                await ensure_field(inferencer.field(name))
+
+    async def fit_records(records: List[Dict], attachments: List[Dict]) -> None:
+        # Values that don't fit their field are kept as text in a
+        # "<field> (text)" field next to it
+        for record, moved in zip(records, attachments):
+            fields = record["fields"]
+            for name in list(moved):
+                if created[name]["type"] not in (None, "multipleAttachments"):
+                    fields[name] = moved.pop(name)
+            for name, value in list(fields.items()):
+                fitted, overflow = fit_value(created[name]["type"], value)
+                if fitted is None:
+                    del fields[name]
+                else:
+                    fields[name] = fitted
+                if overflow is not None:
+                    await ensure_field({"name": f"{name} (text)", "type": "multilineText"})
+                    fields[f"{name} (text)"] = overflow
+                    conflicts[name] = conflicts.get(name, 0) + 1
+
+    # Pages read so far, in order; the journal only moves its resume
+    # point past a page once it and every page before it are fully written
+    page_log: List[Dict[str, Any]] = []
+
+    transfer = journaled_transfer(client, journal, job_id, base_id, table_id)
+
+    def start_page(page: Dict) -> List[Dict]:
+        key = (page_log[-1]["next_offset"] if page_log else resume_offset) or ""
+        records, attachments = [], []
+        for record in page.get("records", []):
+            # Attachments are copied once the record exists
+            attachments.append({})
+            records.append(client._record_for_write(record, attachments[-1]))
+        page_number = first_page + len(page_log)
+        acknowledged = journal.acknowledged_batches(job_id, key, page_number)
+        page_log.append({
+            "offset": key,
+            "number": page_number,
+            "next_offset": page.get("offset"),
+            "records": len(records),
+            "attachments": attachments,
+            "acknowledged": acknowledged,
+            "remaining": (len(records) + 9) // 10 - len(acknowledged),
+            "done": False
+        })
+        advance_pages()
+        return records
+
+    def advance_pages() -> None:
+        for entry in page_log:
+            if entry["done"]:
+                continue
+            if entry["remaining"] > 0:
+                break
+            journal.complete_page(job_id, entry["offset"], entry["number"], entry["next_offset"])
+            entry["done"] = True
+            entry["attachments"] = None
+
+    def batch_acknowledged(page_number: int, batch_number: int) -> bool:
+        return batch_number in page_log[page_number]["acknowledged"]
+
+    def batch_written(page_number: int, batch_number: int, body: Dict) -> None:
+        entry = page_log[page_number]
+        size = min(10, entry["records"] - batch_number * 10)
+        transfers = [
+            (created["id"], field, attachments)
+            for i, created in enumerate(body.get("records", []))
+            for field, attachments in entry["attachments"][batch_number * 10 + i].items()
+        ]
+        journal.acknowledge_batch(job_id, entry["offset"], entry["number"], batch_number, size, transfers)
+        for record_id, field, attachments in transfers:
+            transfer.submit(record_id, field, attachments)
+        entry["remaining"] -= 1
+        advance_pages()
+
+    async def write_page(page: Dict) -> List[Dict]:
+        records = start_page(page)
+        await fit_records(records, page_log[-1]["attachments"])
+        return records
+
+    # Insert records while later pages are still being read
+    async def record_pages() -> AsyncIterator[List[Dict]]:
+        await ensure_fields()
+        for page in buffered:
+            yield await write_page(page)
+        buffered.clear()
+        async for page in pages:
+            inferencer.add_records(page.get("records", []))
+            await ensure_fields()
+            yield await write_page(page)
+
+    try:
+        write_stats = await client.insert_record_stream(
+            base_id, table_id, record_pages(),
+            skip_batch=batch_acknowledged,
+            on_batch_written=batch_written
+        )
+        attachment_stats = await transfer.join()
+    except Exception as e:
+        transfer.cancel()
+        journal.update_job(job_id, status="failed", error=str(e))
+        raise
+
+    journal.update_job(job_id, status="completed")
+    return {
+        "message": "Base created successfully",
+        "job_id": job_id,
+        "base_id": base_id,
+        "structure": {"name": base_name, "fields": list(created.values())},
+        "field_stats": inferencer.stats(),
+        "type_conflicts": conflicts,
+        "write_stats": write_stats,
+        "attachment_stats": attachment_stats,
+        "pending_transfers": journal.get_job(job_id)["pending_transfers"]
+    }
+
+_client: Optional[AirtableClient] = None
+
+def get_client() -> AirtableClient:
+    """Return the shared Airtable client, creating it on first use."""
+    global _client
+    if _client is None or _client.client.is_closed:
+        _client = AirtableClient()
+    return _client
+
+async def close_client() -> None:
+    """Close the shared Airtable client."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def field_expression(field: str) -> str:
+    """SQL expression extracting a field from a mirrored record's JSON."""
+    path = '$."' + field.replace('"', '\\"') + '"'
+    return "json_extract(fields, '" + path.replace("'", "''") + "')"
+
+class RecordMirror:
+    """Local SQLite mirror of Airtable tables.
+
+    Tables are synced incrementally by asking Airtable only for records
+    modified since the previous sync, and queried locally with optional
+    expression indexes on chosen fields.
+    """
+
+    # Overlap between syncs to allow for clock skew with Airtable
+    SYNC_OVERLAP = timedelta(minutes=1)
+    OPERATORS = {"=": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS records (
+                    base_id TEXT NOT NULL,
+                    table_id TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    fields TEXT NOT NULL,
+                    created_time TEXT,
+                    PRIMARY KEY (base_id, table_id, record_id)
+                );
+                CREATE TABLE IF NOT EXISTS syncs (
+                    base_id TEXT NOT NULL,
+                    table_id TEXT NOT NULL,
+                    last_sync TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    indexed_fields TEXT NOT NULL DEFAULT '[]',
+                    PRIMARY KEY (base_id, table_id)
+                );
+            """)
+
+    def sync_state(self, base_id: str, table_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT * FROM syncs WHERE base_id = ? AND table_id = ?", (base_id, table_id)
+        ).fetchone()
+        return dict(row) if row else None
+
+    async def sync(self, client: "AirtableClient", base_id: str, table_id: str, full: bool = False) -> Dict[str, Any]:
+        """Pull records changed since the last sync (or every record if full)."""
+        state = self.sync_state(base_id, table_id)
+        started = datetime.now(timezone.utc)
+        formula = None
+        if state and not full:
+            since = datetime.fromisoformat(state["last_sync"]) - self.SYNC_OVERLAP
+            formula = f"IS_AFTER(LAST_MODIFIED_TIME(), '{since.strftime('%Y-%m-%dT%H:%M:%S.000Z')}')"
+
+        seen = set()
+        async for records in client.iter_table_records(base_id, table_id, formula):
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO records (base_id, table_id, record_id, fields, created_time) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (base_id, table_id, r["id"], json.dumps(r.get("fields", {})), r.get("createdTime"))
+                        for r in records
+                    ]
+                )
+            seen.update(r["id"] for r in records)
+
+        removed = 0
+        if formula is None:
+            # A full sync sees every record, so anything else was deleted upstream
+            existing = {
+                row[0] for row in self.conn.execute(
+                    "SELECT record_id FROM records WHERE base_id = ? AND table_id = ?", (base_id, table_id)
+                )
+            }
+            stale = existing - seen
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM records WHERE base_id = ? AND table_id = ? AND record_id = ?",
+                    [(base_id, table_id, record_id) for record_id in stale]
+                )
+            removed = len(stale)
+
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO syncs (base_id, table_id, last_sync, synced_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (base_id, table_id) DO UPDATE SET last_sync = excluded.last_sync, synced_at = excluded.synced_at""",
+                (base_id, table_id, started.isoformat(), time.time())
+            )
+        return {"mode": "full" if formula is None else "incremental", "upserted": len(seen), "removed": removed}
+
+    def add_indexes(self, base_id: str, table_id: str, fields: List[str]) -> None:
+        """Create expression indexes so filters and sorts on these fields use them."""
+        state = self.sync_state(base_id, table_id)
+        indexed = set(json.loads(state["indexed_fields"])) if state else set()
+        with self.conn:
+            for field in fields:
+                name = "idx_" + uuid.uuid5(uuid.NAMESPACE_OID, f"{base_id}/{table_id}/{field}").hex
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON records (base_id, table_id, {field_expression(field)})"
+                )
+                indexed.add(field)
+            self.conn.execute(
+                "UPDATE syncs SET indexed_fields = ? WHERE base_id = ? AND table_id = ?",
+                (json.dumps(sorted(indexed)), base_id, table_id)
+            )
+
+    def query(
+        self,
+        base_id: str,
+        table_id: str,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        sort_field: Optional[str] = None,
+        descending: bool = False,
+        limit: int = 100
+    ) -> List[Dict]:
+        """Query mirrored records with simple field filters and a sort."""
+        sql = "SELECT record_id, fields, created_time FROM records WHERE base_id = ? AND table_id = ?"
+        params: List[Any] = [base_id, table_id]
+        for condition in filters or []:
+            operator = condition.get("op", "=")
+            expression = field_expression(condition["field"])
+            if operator == "contains":
+                sql += f" AND instr(lower({expression}), lower(?)) > 0"
+            elif operator in self.OPERATORS:
+                sql += f" AND {expression} {self.OPERATORS[operator]} ?"
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+            params.append(condition["value"])
+        if sort_field:
+            sql += f" ORDER BY {field_expression(sort_field)} {'DESC' if descending else 'ASC'}"
+        sql += " LIMIT ?"
+        params.append(limit)
+        return [
+            {"id": row["record_id"], "createdTime": row["created_time"], "fields": json.loads(row["fields"])}
+            for row in self.conn.execute(sql, params)
+        ]
+
+class ContentHashStore:
+    """Content hashes of upserted records, keyed on their merge-field values.
+
+    Only reflects what this server last wrote; edits made directly in
+    Airtable are not detected.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS content_hashes (
+                    base_id TEXT NOT NULL,
+                    table_id TEXT NOT NULL,
+                    record_key TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    PRIMARY KEY (base_id, table_id, record_key)
+                )
+            """)
+
+    @staticmethod
+    def digest(merge_fields: List[str], fields: Dict) -> tuple:
+        """Return the record's (key, hash); the key is None if a merge field is empty.
+
+        Airtable creates a new record for each such row, so they share no
+        identity to skip on and are always sent.
+        """
+        values = [fields.get(field) for field in merge_fields]
+        key = json.dumps(values, default=str) if None not in values else None
+        content = hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+        return key, content
+
+    def changed(self, base_id: str, table_id: str, merge_fields: List[str], records: List[Dict]) -> tuple:
+        """Split out records whose content differs from the stored hash.
+
+        Returns the changed records and their (key, hash) digests by id().
+        """
+        digests = {id(record): self.digest(merge_fields, record["fields"]) for record in records}
+        stored = {}
+        keys = [key for key, _ in digests.values() if key is not None]
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i+500]
+            rows = self.conn.execute(
+                f"SELECT record_key, hash FROM content_hashes WHERE base_id = ? AND table_id = ? AND record_key IN ({','.join('?' * len(chunk))})",
+                (base_id, table_id, *chunk)
+            )
+            stored.update(rows)
+        changed = [
+            record for record in records
+            if digests[id(record)][0] is None or stored.get(digests[id(record)][0]) != digests[id(record)][1]
+        ]
+        return changed, digests
+
+    def store(self, base_id: str, table_id: str, digests: List[tuple]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO content_hashes (base_id, table_id, record_key, hash) VALUES (?, ?, ?, ?)",
+                [(base_id, table_id, key, content) for key, content in digests if key is not None]
+            )
+
+_mirror: Optional[RecordMirror] = None
+_hashes: Optional[ContentHashStore] = None
+
+def get_hash_store() -> ContentHashStore:
+    """Return the upsert content hash store, opening it on first use."""
+    global _hashes
+    if _hashes is None:
+        _hashes = ContentHashStore(AIRTABLE_MIRROR_PATH)
+    return _hashes
+
+def get_mirror() -> RecordMirror:
+    """Return the record mirror, opening it on first use."""
+    global _mirror
+    if _mirror is None:
+        _mirror = RecordMirror(AIRTABLE_MIRROR_PATH)
+    return _mirror
+
+_journal: Optional[CloneJournal] = None
+
+def get_journal() -> CloneJournal:
+    """Return the clone journal, opening it on first use."""
+    global _journal
+    if _journal is None:
+        _journal = CloneJournal(AIRTABLE_JOURNAL_PATH)
+    return _journal
+
+def close_stores() -> None:
+    """Close the local SQLite stores that have been opened."""
+    global _journal, _mirror, _hashes
+    for store in (_journal, _mirror, _hashes):
+        if store is not None:
+            store.conn.close()
+    _journal = _mirror = _hashes = None
 
 @mcp.tool()
 async def clone_shared_view_to_base(url: str, base_name: str) -> str:
@@ -115,31 +1448,148 @@ async def clone_shared_view_to_base(url: str, base_name: str) -> str:
         url: Airtable shared view URL
         base_name: Name for the new base
     """
-    client = AirtableClient()
-    
+    client = get_client()
+    journal = get_journal()
+    job_id = journal.create_job(url, base_name)
+
     try:
-        # Fetch and clone the view structure
-        view_data = await client.fetch_and_clone_view(url)
-        if "error" in view_data:
-            return f"Error fetching view: {view_data['error']}"
+        return await run_clone_job(client, journal, job_id)
 
-        # Create new base with cloned structure
-        base_id = await client.create_base(base_name, [view_data["schema"]])
+    except Exception as e:
+        return f"Error cloning view: {str(e)} (job {job_id}; continue it with resume_clone_job)"
 
-        # Get the first table ID from the new base
-        table_id = view_data["schema"]["id"]
+@mcp.tool()
+async def fetch_shared_view(url: str) -> str:
+    """Fetch a shared view with its linked views cloned in place, without writing anything.
 
-        # Insert records
-        await client.insert_records(base_id, table_id, view_data["records"])
+    Args:
+        url: Airtable shared view URL
+    """
+    view = await get_client().fetch_and_clone_view(url)
+    if "error" in view:
+        return f"Error fetching view: {view['error']}"
+    return json.dumps(view, indent=2)
 
-        return {
-            "message": "Base created successfully",
-            "base_id": base_id,
-            "structure": view_data["schema"]
-        }
+@mcp.tool()
+async def resume_clone_job(job_id: str) -> str:
+    """Resume an interrupted clone job, redoing only the missing work.
+
+    Completed jobs can be resumed to retry attachment transfers that failed.
+
+    Args:
+        job_id: Job id returned by clone_shared_view_to_base
+    """
+    journal = get_journal()
+    job = journal.get_job(job_id)
+    if job is None:
+        return f"No clone job with id {job_id}"
+    if job["status"] == "completed" and not job["pending_transfers"]:
+        return f"Clone job {job_id} has already completed (base {job['base_id']})"
+    if job_id in active_clone_jobs:
+        return f"Clone job {job_id} is still running"
+
+    client = get_client()
+    try:
+        return await run_clone_job(client, journal, job_id)
+
+    except Exception as e:
+        return f"Error resuming clone job {job_id}: {str(e)}"
+
+@mcp.tool()
+async def get_clone_job(job_id: str) -> str:
+    """Show the journaled progress of a clone job.
+
+    Args:
+        job_id: Job id returned by clone_shared_view_to_base
+    """
+    job = get_journal().get_job(job_id)
+    if job is None:
+        return f"No clone job with id {job_id}"
+    return json.dumps(job, indent=2)
+
+@mcp.tool()
+async def sync_table_mirror(
+    base_id: str,
+    table_id: str,
+    full: bool = False,
+    index_fields: Optional[List[str]] = None
+) -> str:
+    """Sync an Airtable table into the local mirror.
+
+    Args:
+        base_id: Airtable base id (app...)
+        table_id: Table id or name
+        full: Re-read every record and drop ones deleted upstream (default: incremental)
+        index_fields: Fields to index locally for faster filtering and sorting
+    """
+    client = get_client()
+    mirror = get_mirror()
+    try:
+        result = await mirror.sync(client, base_id, table_id, full)
+        if index_fields:
+            mirror.add_indexes(base_id, table_id, index_fields)
+        return json.dumps(result, indent=2)
+
+    except Exception as e:
+        return f"Error syncing table: {str(e)}"
+
+@mcp.tool()
+async def query_table_mirror(
+    base_id: str,
+    table_id: str,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    sort_field: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 100
+) -> str:
+    """Query an Airtable table from the local mirror, syncing it first if stale.
+
+    Args:
+        base_id: Airtable base id (app...)
+        table_id: Table id or name
+        filters: Conditions like {"field": "Status", "op": "=", "value": "Done"}; op is one of =, !=, <, <=, >, >=, contains
+        sort_field: Field to sort by
+        descending: Sort in descending order
+        limit: Maximum number of records to return (default: 100)
+    """
+    mirror = get_mirror()
+    try:
+        state = mirror.sync_state(base_id, table_id)
+        if state is None or time.time() - state["synced_at"] > AIRTABLE_MIRROR_MAX_AGE:
+            await mirror.sync(get_client(), base_id, table_id)
+        records = mirror.query(base_id, table_id, filters, sort_field, descending, limit)
+        return json.dumps({"records": records}, indent=2)
+
+    except Exception as e:
+        return f"Error querying table: {str(e)}"
+
+@mcp.tool()
+async def upsert_table_records(
+    base_id: str,
+    table_id: str,
+    records: List[Dict[str, Any]],
+    merge_fields: List[str],
+    skip_unchanged: bool = True
+) -> str:
+    """Upsert records into an Airtable table, sending only rows that changed.
+
+    Args:
+        base_id: Airtable base id (app...)
+        table_id: Table id or name
+        records: Records as field dicts (or {"fields": {...}})
+        merge_fields: Fields that identify a record for the upsert
+        skip_unchanged: Skip records identical to their last upserted content (default: True)
+    """
+    client = get_client()
+    try:
+        stats = await client.upsert_records(
+            base_id, table_id, records, merge_fields,
+            get_hash_store() if skip_unchanged else None
+        )
+        return json.dumps(stats, indent=2)
 
     except Exception as e:
-        return f"Error cloning view: {str(e)}"
+        return f"Error upserting records: {str(e)}"
 
 if __name__ == "__main__":
     mcp.run(transport='stdio')
\ No newline at end of file
@@ -0,0 +1,302 @@
+import asyncio
+import base64
+import json
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("AIRTABLE_API_KEY", "test-key")
+
+import airtable
+from mcp_common.ratelimit import RateLimiter
+
+VIEW_URL = "https://airtable.com/shrView"
+
+PAGES = [
+    [{"id": f"rec{page}{i}", "fields": {"Name": f"p{page}r{i}"}} for i in range(25)]
+    for page in range(3)
+]
+
+def make_handler(posted, fail_on=None, gate=None, expired=()):
+    """Mock Airtable: serves PAGES by offset and records successful inserts.
+
+    Offsets are "<pagination>:<page>", counting paginations from 1; those of
+    paginations in expired are rejected. The insert batch containing
+    fail_on is rejected once with a 422.
+    """
+    failed = set()
+    paginations = []
+
+    async def handler(request):
+        if request.method == "GET":
+            if gate is not None:
+                await gate.wait()
+            offset = request.url.params.get("offset")
+            if offset is None:
+                paginations.append(1)
+                pagination, page = len(paginations), 0
+            else:
+                pagination, page = map(int, offset.split(":"))
+                if pagination in expired:
+                    return httpx.Response(422, json={"error": {"type": "LIST_RECORDS_ITERATOR_NOT_AVAILABLE"}})
+            body = {"records": PAGES[page]}
+            if page + 1 < len(PAGES):
+                body["offset"] = f"{pagination}:{page + 1}"
+            return httpx.Response(200, json=body)
+        if request.url.path.endswith("/meta/bases"):
+            return httpx.Response(200, json={"id": "appNew", "tables": [{"id": "tblNew"}]})
+        if request.url.path.endswith("/fields"):
+            return httpx.Response(200, json={"id": "fldNew"})
+        names = [record["fields"]["Name"] for record in json.loads(request.content)["records"]]
+        if fail_on in names and fail_on not in failed:
+            failed.add(fail_on)
+            return httpx.Response(422, json={"error": "INVALID"})
+        posted.extend(names)
+        return httpx.Response(200, json={"records": [{"id": f"new{name}"} for name in names]})
+
+    return handler
+
+def make_client(handler):
+    client = airtable.AirtableClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client.limiter = RateLimiter(1000, max_retries=0)
+    client.write_concurrency = 1
+    return client
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = airtable.CloneJournal(str(tmp_path / "clone_jobs.sqlite3"))
+    yield journal
+    journal.conn.close()
+
+@pytest.mark.asyncio
+async def test_resume_skips_acknowledged_batches(journal):
+    posted = []
+    client = make_client(make_handler(posted, fail_on="p1r12"))
+    job_id = journal.create_job(VIEW_URL, "Copy")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await airtable.run_clone_job(client, journal, job_id)
+
+    job = journal.get_job(job_id)
+    assert job["status"] == "failed"
+    assert job["base_id"] == "appNew"
+    # Page 0 is complete; page 1 stopped after its first batch
+    assert job["page_offset"] == "1:1"
+    assert job["acknowledged_batches"] == 1
+    assert job["records_written"] == 35
+
+    first_run = list(posted)
+    result = await airtable.run_clone_job(client, journal, job_id)
+
+    assert result["base_id"] == "appNew"
+    resumed = posted[len(first_run):]
+    assert resumed[0] == "p1r10"
+    assert sorted(posted) == sorted(r["fields"]["Name"] for page in PAGES for r in page)
+    job = journal.get_job(job_id)
+    assert job["status"] == "completed"
+    assert job["records_written"] == 75
+    assert job["page_offset"] is None
+
+@pytest.mark.asyncio
+async def test_resume_restarts_pagination_when_offset_expired(journal):
+    posted, expired = [], set()
+    client = make_client(make_handler(posted, fail_on="p1r12", expired=expired))
+    job_id = journal.create_job(VIEW_URL, "Copy")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await airtable.run_clone_job(client, journal, job_id)
+    first_run = list(posted)
+    expired.add(1)
+
+    await airtable.run_clone_job(client, journal, job_id)
+
+    # Page 0 and page 1's first batch are not written again
+    assert posted[len(first_run)] == "p1r10"
+    assert sorted(posted) == sorted(r["fields"]["Name"] for page in PAGES for r in page)
+    job = journal.get_job(job_id)
+    assert job["status"] == "completed"
+    assert job["records_written"] == 75
+    assert job["acknowledged_batches"] == 0
+
+@pytest.mark.asyncio
+async def test_resume_refused_while_job_is_running(journal, monkeypatch):
+    gate = asyncio.Event()
+    client = make_client(make_handler([], gate=gate))
+    monkeypatch.setattr(airtable, "_client", client)
+    monkeypatch.setattr(airtable, "_journal", journal)
+    job_id = journal.create_job(VIEW_URL, "Copy")
+
+    running = asyncio.create_task(airtable.run_clone_job(client, journal, job_id))
+    await asyncio.sleep(0)
+    assert await airtable.resume_clone_job(job_id) == f"Clone job {job_id} is still running"
+    with pytest.raises(RuntimeError):
+        await airtable.run_clone_job(client, journal, job_id)
+
+    gate.set()
+    result = await running
+    assert result["write_stats"]["records"] == 75
+    assert job_id not in airtable.active_clone_jobs
+
+def test_schema_puts_a_primary_compatible_field_first():
+    inferencer = airtable.SchemaInferencer()
+    inferencer.add_records([{"fields": {"Done": True, "Tags": ["a"], "Score": 3, "Title": "x"}}])
+    assert [field["name"] for field in inferencer.schema()["fields"]] == ["Score", "Done", "Tags", "Title"]
+
+    inferencer = airtable.SchemaInferencer()
+    inferencer.add_records([{"fields": {"Name": True, "Files": [{"url": "https://example.com/a.png"}]}}])
+    fields = inferencer.schema()["fields"]
+    assert fields[0] == {"name": "Name (primary)", "type": "singleLineText"}
+    assert [field["name"] for field in fields[1:]] == ["Name", "Files"]
+
+@pytest.mark.asyncio
+async def test_failed_write_releases_producer_and_pages():
+    client = make_client(make_handler([], fail_on="p0r0"))
+    closed = []
+
+    async def pages():
+        try:
+            for page in PAGES * 4:
+                yield page
+        finally:
+            closed.append(True)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.insert_record_stream("appBase", "tblTable", pages())
+
+    assert closed == [True]
+    pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    assert pending == []
+
+@pytest.mark.asyncio
+async def test_reads_writes_and_meta_calls_share_the_base_limit():
+    client = make_client(make_handler([]))
+    base_id = "appABCDEFGHIJKLMN"
+    async for _ in client.iter_table_records(base_id, "tblTable"):
+        pass
+    await client.insert_records(base_id, "tblTable", PAGES[0][:10])
+    await client.create_field(base_id, "tblTable", {"name": "Notes", "type": "multilineText"})
+    await client.create_base("Copy", [])
+
+    stats = client.limiter.stats()
+    assert sorted(stats) == ["api.airtable.com", base_id]
+    assert stats[base_id]["requests"] == 5
+
+FILE_URL = "https://files.example.com/report.pdf"
+
+@pytest.mark.asyncio
+async def test_stream_attachment_body_decodes_to_file():
+    # Spans several read chunks and is not a multiple of 3 bytes long
+    data = os.urandom(airtable.AIRTABLE_ATTACHMENT_CHUNK_SIZE * 2 + 5)
+    uploads = []
+
+    async def handler(request):
+        if request.method == "GET":
+            assert "Authorization" not in request.headers
+            return httpx.Response(200, content=data, headers={"Content-Type": "application/pdf"})
+        uploads.append(json.loads(await request.aread()))
+        return httpx.Response(200, json={"id": "recA"})
+
+    client = make_client(handler)
+    attachment = {"url": FILE_URL, "filename": "report.pdf", "size": len(data)}
+    transferred = await client.stream_attachment("appBase", "recA", "Files", attachment)
+
+    assert transferred == len(data)
+    assert uploads[0]["contentType"] == "application/pdf"
+    assert uploads[0]["filename"] == "report.pdf"
+    assert base64.b64decode(uploads[0]["file"]) == data
+
+@pytest.mark.asyncio
+async def test_resume_retries_failed_attachment_transfers(journal):
+    uploads, failures = [], [1]
+    records = [
+        {"id": "rec1", "fields": {"Name": "a", "Files": [{"url": FILE_URL, "filename": "report.pdf", "size": 3}]}}
+    ]
+
+    async def handler(request):
+        if request.url.host == "files.example.com":
+            return httpx.Response(200, content=b"pdf")
+        if request.method == "GET":
+            return httpx.Response(200, json={"records": records})
+        if request.url.path.endswith("/meta/bases"):
+            return httpx.Response(200, json={"id": "appNew", "tables": [{"id": "tblNew"}]})
+        if request.url.path.endswith("/uploadAttachment"):
+            if failures:
+                failures.pop()
+                return httpx.Response(500)
+            uploads.append(request.url.path)
+            return httpx.Response(200, json={"id": "recNew"})
+        return httpx.Response(200, json={"records": [{"id": "recNew"}]})
+
+    client = make_client(handler)
+    job_id = journal.create_job(VIEW_URL, "Copy")
+
+    result = await airtable.run_clone_job(client, journal, job_id)
+    assert result["attachment_stats"]["failed"] == 1
+    assert result["pending_transfers"] == 1
+    job = journal.get_job(job_id)
+    assert job["status"] == "completed"
+    assert (job["pending_files"], job["failed_transfers"]) == (1, 1)
+
+    result = await airtable.run_clone_job(client, journal, job_id)
+    assert result["attachment_stats"]["uploaded"] == 1
+    assert uploads == ["/v0/appNew/recNew/Files/uploadAttachment"]
+    assert journal.get_job(job_id)["pending_transfers"] == 0
+
+def make_upsert_handler(sent, fail_on=None):
+    """Mock upsert endpoint recording the Name of every record written."""
+    async def handler(request):
+        records = json.loads(request.content)["records"]
+        names = [record["fields"].get("Name") for record in records]
+        if fail_on in names:
+            return httpx.Response(422, json={"error": "INVALID"})
+        sent.extend(names)
+        return httpx.Response(200, json={"records": [{"id": f"rec{i}"} for i in range(len(records))]})
+
+    return handler
+
+@pytest.fixture
+def hashes(tmp_path):
+    hashes = airtable.ContentHashStore(str(tmp_path / "mirror.sqlite3"))
+    yield hashes
+    hashes.conn.close()
+
+@pytest.mark.asyncio
+async def test_upsert_skips_unchanged_records(hashes):
+    sent = []
+    client = make_client(make_upsert_handler(sent))
+    rows = [{"Key": i, "Name": f"r{i}"} for i in range(15)]
+
+    await client.upsert_records("appA", "tblA", rows, ["Key"], hashes)
+    rows[3] = {"Key": 3, "Name": "changed"}
+    stats = await client.upsert_records("appA", "tblA", rows, ["Key"], hashes)
+
+    assert sent[15:] == ["changed"]
+    assert stats["unchanged"] == 14
+
+@pytest.mark.asyncio
+async def test_upsert_stores_hashes_only_for_written_batches(hashes):
+    sent = []
+    rows = [{"Key": i, "Name": f"r{i}"} for i in range(25)]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await make_client(make_upsert_handler(sent, fail_on="r12")).upsert_records("appA", "tblA", rows, ["Key"], hashes)
+    assert sent == [f"r{i}" for i in range(10)]
+
+    sent.clear()
+    await make_client(make_upsert_handler(sent)).upsert_records("appA", "tblA", rows, ["Key"], hashes)
+    assert sent == [f"r{i}" for i in range(10, 25)]
+
+@pytest.mark.asyncio
+async def test_upsert_always_sends_records_without_merge_values(hashes):
+    sent = []
+    client = make_client(make_upsert_handler(sent))
+    rows = [{"Name": "a"}, {"Name": "b", "Key": None}]
+
+    await client.upsert_records("appA", "tblA", rows, ["Key"], hashes)
+    stats = await client.upsert_records("appA", "tblA", rows, ["Key"], hashes)
+
+    assert sent == ["a", "b", "a", "b"]
+    assert stats["unchanged"] == 0
+    assert hashes.conn.execute("SELECT COUNT(*) FROM content_hashes").fetchone()[0] == 0
@@ -1,14 +1,33 @@
+from collections import Counter, OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from pathlib import Path
 from typing import Any, List
+import asyncio
 import httpx
 import json
 from mcp.server.fastmcp import FastMCP
 import os
+import re
+import sqlite3
+import sys
+import threading
+import time
 from dotenv import load_dotenv
+from rapidfuzz import fuzz as rapid_fuzz, process
 from thefuzz import fuzz
-import spacy
-from spacy.tokens import Token
-from spacy_wordnet.wordnet_annotator import WordnetAnnotator
-Token.set_extension('wordnet', getter=lambda token: token._.get_wordnet())
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if find_spec("mcp_common") is None:
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+from mcp_common.ratelimit import RateLimiter
+from mcp_common.singleflight import SingleFlight
+
 load_dotenv()
 
 # Read the RAPIDAPI_KEY from the environment variables
@@ -16,14 +35,52 @@ RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 if not RAPIDAPI_KEY:
     raise ValueError("RAPIDAPI_KEY is not set in the environment variables")
 
-mcp = FastMCP("linkedin_profile_scraper")
-
 LINKEDIN_API_BASE = "https://fresh-linkedin-profile-data.p.rapidapi.com"
 RAPIDAPI_HOST = "fresh-linkedin-profile-data.p.rapidapi.com"
 
-# Load spaCy model for synonym handling
-nlp = spacy.load('en_core_web_sm')
-nlp.add_pipe("spacy_wordnet", after="tagger")  # must add pipe
+# Synonym lookup settings. spaCy and WordNet are only imported on the first
+# lookup that needs them; LINKEDIN_USE_SPACY=0 keeps them out entirely and
+# relies on the synonym table (a JSON object of keyword -> synonyms).
+SYNONYM_TABLE_PATH = os.getenv("LINKEDIN_SYNONYM_TABLE")
+USE_SPACY = os.getenv("LINKEDIN_USE_SPACY", "1").lower() not in ("0", "false", "no")
+WARM_NLP = os.getenv("LINKEDIN_WARM_NLP", "").lower() in ("1", "true", "yes")
+
+# Memoized synonym expansions, optionally persisted to a JSON file
+SYNONYM_CACHE_SIZE = int(os.getenv("LINKEDIN_SYNONYM_CACHE_SIZE", "1024"))
+SYNONYM_CACHE_PATH = os.getenv("LINKEDIN_SYNONYM_CACHE_PATH")
+SYNONYM_CACHE_FLUSH_INTERVAL = float(os.getenv("LINKEDIN_SYNONYM_CACHE_FLUSH_INTERVAL", "30"))
+
+# Multi-page search: pages fetched at once, default page budget, and the
+# fields tried in order to recognise the same profile across pages
+PAGE_CONCURRENCY = int(os.getenv("LINKEDIN_PAGE_CONCURRENCY", "3"))
+MAX_SEARCH_PAGES = int(os.getenv("LINKEDIN_MAX_SEARCH_PAGES", "5"))
+PROFILE_ID_FIELDS = ("profile_id", "urn", "public_id", "linkedin_url", "profile_url")
+
+# Pacing for the RapidAPI plan's request quota
+REQUESTS_PER_SECOND = float(os.getenv("LINKEDIN_REQUESTS_PER_SECOND", "5"))
+MAX_CONCURRENCY = int(os.getenv("LINKEDIN_MAX_CONCURRENCY", "4"))
+MAX_RETRIES = int(os.getenv("LINKEDIN_MAX_RETRIES", "3"))
+
+# Cache of raw search responses, keyed on the normalized upstream params.
+# A TTL of 0 disables it.
+RESPONSE_CACHE_PATH = os.getenv(
+    "LINKEDIN_RESPONSE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_cache.sqlite3")
+)
+RESPONSE_CACHE_TTL = float(os.getenv("LINKEDIN_RESPONSE_CACHE_TTL", "86400"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("LINKEDIN_RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+
+# Local store of every profile fetched upstream, with an inverted index of
+# word and trigram postings over INDEX_FIELDS for local-first searches
+PROFILE_STORE_PATH = os.getenv(
+    "LINKEDIN_PROFILE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.sqlite3")
+)
+INDEX_FIELDS = ("title", "headline", "job_title", "company", "industry", "location")
+LOCAL_CANDIDATE_LIMIT = int(os.getenv("LINKEDIN_LOCAL_CANDIDATE_LIMIT", "500"))
+
+# Profile fields scored by the batch matcher
+MATCH_FIELDS = ("full_name", "headline", "title", "job_title", "company", "industry", "location", "about")
 
 HARDCODED_SYNONYMS = {
     "VC": ["venture capital", "venture capitalist"],
@@ -31,6 +88,331 @@ HARDCODED_SYNONYMS = {
     "CEO": ["chief executive officer"]
 }
 
+_nlp = None
+_nlp_lock = threading.Lock()
+_synonym_table = None
+
+def get_nlp():
+    """Load the spaCy model with the WordNet pipe on first use.
+
+    Returns None when spaCy is disabled.
+    """
+    global _nlp
+    if not USE_SPACY:
+        return None
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            from spacy.tokens import Token
+            from spacy_wordnet.wordnet_annotator import WordnetAnnotator
+            if not Token.has_extension('wordnet'):
+                Token.set_extension('wordnet', getter=lambda token: token._.get_wordnet())
+            # Load spaCy model for synonym handling
+            nlp = spacy.load('en_core_web_sm')
+            nlp.add_pipe("spacy_wordnet", after="tagger")  # must add pipe
+            _nlp = nlp
+    return _nlp
+
+async def load_nlp() -> None:
+    """Load the NLP stack on a worker thread if it is not loaded yet.
+
+    Tools call this before building SearchCriteria, whose synonym
+    expansion would otherwise load spaCy (or wait for a warm-up already
+    loading it) on the event loop and stall the server.
+    """
+    if USE_SPACY and _nlp is None:
+        await asyncio.to_thread(get_nlp)
+
+def get_synonym_table() -> dict[str, List[str]]:
+    """Load the precomputed synonym table, keyed on normalized keywords."""
+    global _synonym_table
+    if _synonym_table is None:
+        _synonym_table = {}
+        if SYNONYM_TABLE_PATH:
+            with open(SYNONYM_TABLE_PATH, encoding="utf-8") as f:
+                _synonym_table = {normalize_keyword(k): v for k, v in json.load(f).items()}
+    return _synonym_table
+
+def warm_nlp_in_background() -> threading.Thread:
+    """Load the NLP stack on a background thread so the first lookup is fast."""
+    thread = threading.Thread(target=get_nlp, name="warm-nlp", daemon=True)
+    thread.start()
+    return thread
+
+def normalize_keyword(text: str) -> str:
+    """Normalize a keyword for synonym lookups."""
+    return " ".join(text.lower().split())
+
+class SynonymCache:
+    """LRU cache of synonym expansions keyed on normalized keywords.
+
+    When a path is given, expansions are loaded from and written back to a
+    JSON file so they survive restarts. The file is rewritten at most once
+    per flush_interval; call flush() before exiting to keep the rest.
+    """
+
+    def __init__(self, max_entries: int, path: str = None, flush_interval: float = 30.0):
+        self.max_entries = max_entries
+        self.path = path
+        self.flush_interval = flush_interval
+        self.dirty = False
+        self._flushed_at = time.monotonic()
+        self._entries: OrderedDict[str, List[str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.load()
+
+    def get(self, key: str) -> List[str] | None:
+        with self._lock:
+            synonyms = self._entries.get(key)
+            if synonyms is None:
+                return None
+            self._entries.move_to_end(key)
+            return list(synonyms)
+
+    def put(self, key: str, synonyms: List[str]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = list(synonyms)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.dirty = True
+            if time.monotonic() - self._flushed_at >= self.flush_interval:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write pending expansions to the cache file."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.dirty:
+            self.save()
+            self.dirty = False
+        self._flushed_at = time.monotonic()
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries.update(json.load(f))
+        except (OSError, ValueError):
+            return
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+synonym_cache = SynonymCache(SYNONYM_CACHE_SIZE, SYNONYM_CACHE_PATH, SYNONYM_CACHE_FLUSH_INTERVAL)
+
+def expand_synonyms(text: str) -> List[str]:
+    """Get synonyms from the synonym table, falling back to spaCy.
+
+    Expansion works on the normalized keyword, so every spelling that
+    shares a cache entry gets the same synonyms.
+    """
+    keyword = normalize_keyword(text)
+    table = get_synonym_table()
+    if keyword in table:
+        return list(set(table[keyword]))
+
+    # Copy so the shared hardcoded lists are never modified
+    synonyms = list(HARDCODED_SYNONYMS.get(keyword.upper(), []))
+    nlp = get_nlp()
+    if nlp is None:
+        return list(set(synonyms))
+    doc = nlp(keyword)
+    for token in doc:
+        for synset in token._.wordnet.synsets():
+            for lemma in synset.lemmas():
+                if lemma.name() != token.text:
+                    synonyms.append(lemma.name())
+    return list(set(synonyms))
+
+class ResponseCache:
+    """SQLite cache of raw search responses with a TTL and an entry cap."""
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response body for key, if it has not expired."""
+        row = self.conn.execute(
+            "SELECT body FROM responses WHERE key = ? AND fetched_at > ?",
+            (key, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, body: str) -> None:
+        """Store a response body, evicting expired and oldest entries."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, fetched_at) VALUES (?, ?, ?)",
+                (key, body, time.time())
+            )
+            self.conn.execute("DELETE FROM responses WHERE fetched_at <= ?", (time.time() - self.ttl,))
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+_response_cache: ResponseCache | None = None
+search_flight = SingleFlight()
+search_limiter = RateLimiter(REQUESTS_PER_SECOND, MAX_CONCURRENCY, MAX_RETRIES)
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the search response cache, opening it on first use."""
+    global _response_cache
+    if RESPONSE_CACHE_TTL <= 0:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES)
+    return _response_cache
+
+def index_grams(text: str) -> set[str]:
+    """Word and character trigram postings for text."""
+    grams = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        grams.add(f"w:{word}")
+        padded = f" {word} "
+        grams.update(f"g:{padded[i:i+3]}" for i in range(len(padded) - 2))
+    return grams
+
+class ProfileStore:
+    """Profiles fetched from the API, keyed by profile_key, with an
+    inverted index of word/trigram postings over INDEX_FIELDS."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    profile_key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    gram TEXT NOT NULL,
+                    profile_key TEXT NOT NULL,
+                    PRIMARY KEY (gram, profile_key)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS postings_profile ON postings (profile_key)")
+
+    def add_profiles(self, profiles: List[dict]) -> None:
+        """Insert or refresh profiles and their postings."""
+        now = time.time()
+        with self.conn:
+            for profile in profiles:
+                key = profile_key(profile)
+                text = " ".join(
+                    profile[field] for field in INDEX_FIELDS if isinstance(profile.get(field), str)
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO profiles (profile_key, body, updated_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(profile), now)
+                )
+                self.conn.execute("DELETE FROM postings WHERE profile_key = ?", (key,))
+                self.conn.executemany(
+                    "INSERT INTO postings (gram, profile_key) VALUES (?, ?)",
+                    [(gram, key) for gram in index_grams(text)]
+                )
+
+    def candidates(self, terms: List[str], limit: int) -> List[dict]:
+        """Profiles sharing the most postings with any of the terms.
+
+        Grams are looked up in chunks (SQLite caps bound parameters) and
+        the hit counts merged, so long queries keep every gram.
+        """
+        grams = list(set().union(*(index_grams(term) for term in terms))) if terms else []
+        if not grams:
+            return []
+        hits: Counter = Counter()
+        for i in range(0, len(grams), 500):
+            chunk = grams[i:i+500]
+            hits.update(dict(self.conn.execute(
+                f"SELECT profile_key, COUNT(*) FROM postings WHERE gram IN ({','.join('?' * len(chunk))}) GROUP BY profile_key",
+                chunk
+            )))
+        keys = [key for key, _ in hits.most_common(limit)]
+        if not keys:
+            return []
+        bodies = dict(self.conn.execute(
+            f"SELECT profile_key, body FROM profiles WHERE profile_key IN ({','.join('?' * len(keys))})",
+            keys
+        ))
+        return [json.loads(bodies[key]) for key in keys if key in bodies]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+_profile_store: ProfileStore | None = None
+
+def get_profile_store() -> ProfileStore:
+    """Return the local profile store, opening it on first use."""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore(PROFILE_STORE_PATH)
+    return _profile_store
+
+def close_stores() -> None:
+    """Close the local SQLite stores that have been opened."""
+    global _response_cache, _profile_store
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
+    if _profile_store is not None:
+        _profile_store.close()
+        _profile_store = None
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Optionally warm the NLP stack once the server is up."""
+    if WARM_NLP and USE_SPACY:
+        warm_nlp_in_background()
+    try:
+        yield
+    finally:
+        close_stores()
+        synonym_cache.flush()
+
+mcp = FastMCP("linkedin_profile_scraper", lifespan=server_lifespan)
+
 class SearchCriteria:
     def __init__(
         self,
@@ -53,15 +435,13 @@ class SearchCriteria:
         self.synonyms = self._get_synonyms(keyword)
 
     def _get_synonyms(self, text: str) -> List[str]:
-        """Get synonyms using spaCy"""
-        doc = nlp(text)
-        synonyms = HARDCODED_SYNONYMS.get(text.upper(), [])
-        for token in doc:
-            for synset in token._.wordnet.synsets():
-                for lemma in synset.lemmas():
-                    if lemma.name() != token.text:
-                        synonyms.append(lemma.name())
-        return list(set(synonyms))
+        """Get synonyms for text, memoized on the normalized keyword"""
+        key = normalize_keyword(text)
+        synonyms = synonym_cache.get(key)
+        if synonyms is None:
+            synonyms = expand_synonyms(key)
+            synonym_cache.put(key, synonyms)
+        return synonyms
 
     def matches_criteria(self, profile_text: str) -> bool:
         """Check if profile matches search criteria using fuzzy matching"""
@@ -79,11 +459,62 @@ class SearchCriteria:
 
         return False
 
-async def search_linkedin_profiles(
-    criteria: SearchCriteria,
-    page: int = 1
-) -> dict[str, Any] | None:
-    """Enhanced LinkedIn profile search with smart matching."""
+    def query_terms(self) -> List[str]:
+        """Lowercased keyword followed by its synonyms, without duplicates"""
+        terms = [self.keyword.lower()]
+        for synonym in self.synonyms:
+            if synonym.lower() not in terms:
+                terms.append(synonym.lower())
+        return terms
+
+    def score_profiles(self, profiles: List[dict]) -> List[float]:
+        """Score every profile against all query terms in one pass.
+
+        Each profile's score is its best partial_ratio over the keyword and
+        synonyms, found with rapidfuzz's extractOne (process.cdist would
+        pull in numpy, which rapidfuzz does not depend on). Without partial
+        matching it is 100 for a keyword substring, else 0.
+        """
+        texts = [profile_match_text(profile) for profile in profiles]
+        if not texts:
+            return []
+        if not self.partial_match:
+            keyword = self.keyword.lower()
+            return [100.0 if keyword in text else 0.0 for text in texts]
+        terms = self.query_terms()
+        return [
+            float(process.extractOne(text, terms, scorer=rapid_fuzz.partial_ratio)[1])
+            for text in texts
+        ]
+
+    def rank_profiles(self, profiles: List[dict], top_k: int = None) -> List[tuple[float, dict]]:
+        """Return (score, profile) pairs meeting min_similarity, best first"""
+        scored = [
+            (score, profile)
+            for score, profile in zip(self.score_profiles(profiles), profiles)
+            if score >= self.min_similarity
+        ]
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored[:top_k] if top_k else scored
+
+def profile_match_text(profile: dict) -> str:
+    """Lowercased text of the fields a profile is matched on."""
+    values = []
+    for field in MATCH_FIELDS:
+        value = profile.get(field)
+        if isinstance(value, str) and value:
+            values.append(value)
+    return " | ".join(values).lower()
+
+def profile_key(profile: dict) -> str:
+    """Stable identity for a profile, used to dedupe across result pages."""
+    for field in PROFILE_ID_FIELDS:
+        if profile.get(field):
+            return f"{field}:{profile[field]}"
+    return json.dumps(profile, sort_keys=True)
+
+def search_params(criteria: SearchCriteria, page: int = 1) -> dict[str, Any]:
+    """Upstream query params for a criteria and page."""
     params = {
         "keyword": criteria.keyword,
         "page": page
@@ -97,7 +528,36 @@ async def search_linkedin_profiles(
         params["title"] = criteria.title
     if criteria.company:
         params["company"] = criteria.company
+    return params
+
+def search_cache_key(params: dict[str, Any]) -> str:
+    """Cache key for upstream params, insensitive to case and spacing."""
+    normalized = {
+        name: normalize_keyword(value) if isinstance(value, str) else value
+        for name, value in params.items()
+    }
+    return json.dumps(normalized, sort_keys=True)
+
+async def fetch_profile_page(
+    criteria: SearchCriteria,
+    page: int = 1
+) -> dict[str, Any] | None:
+    """Fetch one page of raw search results, served from the cache if fresh.
 
+    Only the upstream params are part of the cache key, so searches that
+    differ in matching settings (e.g. min_similarity) share one fetch.
+    Concurrent fetches of the same page are coalesced.
+    """
+    params = search_params(criteria, page)
+    key = search_cache_key(params)
+    cache = get_response_cache()
+    body = cache.get(key) if cache else None
+    if body is None:
+        body = await search_flight.do(key, lambda: _fetch_profile_page(key, params))
+    # Each caller gets its own copy to post-process
+    return json.loads(body) if body is not None else None
+
+async def _fetch_profile_page(key: str, params: dict[str, Any]) -> str | None:
     headers = {
         "x-rapidapi-key": RAPIDAPI_KEY,
         "x-rapidapi-host": RAPIDAPI_HOST
@@ -105,26 +565,159 @@ async def search_linkedin_profiles(
 
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.get(
+            response = await search_limiter.send(RAPIDAPI_HOST, lambda: client.get(
                 f"{LINKEDIN_API_BASE}/search-linkedin-profile",
                 headers=headers,
                 params=params,
                 timeout=30.0
-            )
+            ))
             response.raise_for_status()
             data = response.json()
-
-            # Post-process results with smart matching
-            if data and "results" in data:
-                data["results"] = [
-                    result for result in data["results"]
-                    if criteria.matches_criteria(json.dumps(result))
-                ]
-
-            return data
+            if not isinstance(data, dict):
+                return None
         except Exception:
             return None
 
+    body = json.dumps(data)
+    cache = get_response_cache()
+    if cache:
+        cache.put(key, body)
+    results = data.get("results")
+    if isinstance(results, list):
+        try:
+            get_profile_store().add_profiles([r for r in results if isinstance(r, dict)])
+        except sqlite3.Error:
+            pass
+    return body
+
+async def search_linkedin_profiles(
+    criteria: SearchCriteria,
+    page: int = 1,
+    top_k: int = None
+) -> dict[str, Any] | None:
+    """Enhanced LinkedIn profile search with smart matching.
+
+    Matching results are ranked by match_score; top_k keeps only the best.
+    """
+    data = await fetch_profile_page(criteria, page)
+
+    # Post-process results with smart matching
+    if data and "results" in data:
+        data["results"] = [
+            {**result, "match_score": round(score, 1)}
+            for score, result in criteria.rank_profiles(data["results"], top_k)
+        ]
+
+    return data
+
+async def search_profiles_until(
+    criteria: SearchCriteria,
+    target_count: int,
+    start_page: int = 1,
+    max_pages: int = MAX_SEARCH_PAGES
+) -> dict[str, Any] | None:
+    """Search consecutive pages until target_count unique matches are found.
+
+    Up to PAGE_CONCURRENCY pages are fetched at once. No new page is
+    requested once enough matches are collected, the page budget is spent,
+    a page comes back empty, or a request fails. Failed pages are listed
+    in failed_pages, and next_page is the first page not fetched.
+    """
+    last_page = start_page + max_pages - 1
+    next_page = start_page
+    matches: dict[str, tuple[float, dict]] = {}
+    pages_fetched: List[int] = []
+    failed_pages: List[int] = []
+    end_page = None
+
+    def done() -> bool:
+        return (
+            end_page is not None or failed_pages
+            or len(matches) >= target_count or next_page > last_page
+        )
+
+    async def worker() -> None:
+        nonlocal next_page, end_page
+        while not done():
+            page = next_page
+            next_page += 1
+            data = await fetch_profile_page(criteria, page)
+            if data is None:
+                failed_pages.append(page)
+                return
+            pages_fetched.append(page)
+            results = data.get("results") or []
+            if not results:
+                end_page = page if end_page is None else min(end_page, page)
+                return
+            for score, profile in criteria.rank_profiles(results):
+                matches.setdefault(profile_key(profile), (score, profile))
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(PAGE_CONCURRENCY, max_pages)))))
+
+    if not pages_fetched:
+        return None
+    # Failures past the last page of results don't matter
+    failed_pages = sorted(page for page in failed_pages if end_page is None or page < end_page)
+    if failed_pages:
+        # Resume from the first page that was not fetched
+        resume_page = failed_pages[0]
+    else:
+        resume_page = None if end_page is not None else max(pages_fetched) + 1
+    ranked = sorted(matches.values(), key=lambda pair: pair[0], reverse=True)
+    data = {
+        "results": [
+            {**profile, "match_score": round(score, 1)}
+            for score, profile in ranked[:target_count]
+        ],
+        "pages_fetched": sorted(pages_fetched),
+        "next_page": resume_page
+    }
+    if failed_pages:
+        data["failed_pages"] = failed_pages
+        data["error"] = f"Request for page {failed_pages[0]} failed; results may be incomplete."
+    return data
+
+def profile_id(profile: dict) -> Any:
+    """The profile's upstream id, falling back to its name."""
+    for field in PROFILE_ID_FIELDS:
+        if profile.get(field):
+            return profile[field]
+    return profile.get("full_name")
+
+def format_search_results(
+    data: dict[str, Any],
+    fields: List[str] = None,
+    compact: bool = False,
+    ids_only: bool = False
+) -> str:
+    """Serialize search output, optionally projected and compact.
+
+    ids_only reduces each result to its id and match_score; fields keeps
+    only the named profile fields (plus match_score). Compact output has no
+    indentation and uses orjson when it is installed.
+    """
+    results = data.get("results")
+    if isinstance(results, list) and (ids_only or fields):
+        if ids_only:
+            projected = [
+                {"id": profile_id(result), "match_score": result.get("match_score")}
+                for result in results
+            ]
+        else:
+            keep = set(fields) | {"match_score"}
+            projected = [
+                {name: value for name, value in result.items() if name in keep}
+                for result in results
+            ]
+        data = {**data, "results": projected}
+
+    if not compact:
+        return json.dumps(data, indent=2)
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"))
+
 @mcp.tool()
 async def smart_search_profiles(
     keyword: str,
@@ -134,7 +727,13 @@ async def smart_search_profiles(
     company: str = None,
     partial_match: bool = True,
     min_similarity: int = 70,
-    page: int = 1
+    page: int = 1,
+    top_k: int = None,
+    target_count: int = None,
+    max_pages: int = MAX_SEARCH_PAGES,
+    fields: List[str] = None,
+    compact: bool = False,
+    ids_only: bool = False
 ) -> str:
     """Enhanced LinkedIn profile search with smart matching capabilities.
 
@@ -147,7 +746,15 @@ async def smart_search_profiles(
         partial_match: Enable partial/fuzzy matching (default: True)
         min_similarity: Minimum similarity score for matches (0-100, default: 70)
         page: Page number for results
+        top_k: Only return the best top_k matches, ranked by match_score
+        target_count: Search pages from `page` onwards until this many unique
+            matches are found (fetched concurrently, at most max_pages pages)
+        max_pages: Page budget when target_count is set (default: 5)
+        fields: Only return these profile fields (e.g. ["full_name", "title"])
+        compact: Return unindented JSON (default: False)
+        ids_only: Return only profile ids and match scores (default: False)
     """
+    await load_nlp()
     criteria = SearchCriteria(
         keyword=keyword,
         location=location,
@@ -158,10 +765,123 @@ async def smart_search_profiles(
         min_similarity=min_similarity
     )
 
-    data = await search_linkedin_profiles(criteria, page)
+    if target_count:
+        data = await search_profiles_until(criteria, target_count, page, max_pages)
+    else:
+        data = await search_linkedin_profiles(criteria, page, top_k)
     if not data:
         return "Unable to search LinkedIn profiles."
-    return json.dumps(data, indent=2)
+    return format_search_results(data, fields, compact, ids_only)
+
+def local_filters_match(criteria: SearchCriteria, profile: dict) -> bool:
+    """Apply the upstream filters (location, industry, title, company) locally."""
+    filters = (
+        (criteria.location, ("location",)),
+        (criteria.industry, ("industry",)),
+        (criteria.title, ("title", "headline", "job_title")),
+        (criteria.company, ("company",)),
+    )
+    for value, fields in filters:
+        if not value:
+            continue
+        wanted = normalize_keyword(value)
+        if not any(
+            wanted in normalize_keyword(profile[field])
+            for field in fields if isinstance(profile.get(field), str)
+        ):
+            return False
+    return True
+
+def search_local_profiles(criteria: SearchCriteria, limit: int = None) -> List[tuple[float, dict]]:
+    """Rank stored profiles against criteria, best first.
+
+    Candidates come from the inverted index for the keyword and its
+    synonyms and are then scored with the same matcher as API results.
+    """
+    candidates = [
+        profile for profile in get_profile_store().candidates(criteria.query_terms(), LOCAL_CANDIDATE_LIMIT)
+        if local_filters_match(criteria, profile)
+    ]
+    return criteria.rank_profiles(candidates, limit)
+
+@mcp.tool()
+async def local_first_search_profiles(
+    keyword: str,
+    location: str = None,
+    industry: str = None,
+    title: str = None,
+    company: str = None,
+    partial_match: bool = True,
+    min_similarity: int = 70,
+    min_results: int = 10,
+    max_pages: int = MAX_SEARCH_PAGES,
+    fields: List[str] = None,
+    compact: bool = False,
+    ids_only: bool = False
+) -> str:
+    """Search previously fetched profiles first, calling the API only if needed.
+
+    Args:
+        keyword: Search keyword (e.g., "seed investor", "angel investor")
+        location: Location filter
+        industry: Industry filter
+        title: Title filter
+        company: Company filter
+        partial_match: Enable partial/fuzzy matching (default: True)
+        min_similarity: Minimum similarity score for matches (0-100, default: 70)
+        min_results: Fall back to the API when fewer local matches are found (default: 10)
+        max_pages: Page budget for the API fallback (default: 5)
+        fields: Only return these profile fields (e.g. ["full_name", "title"])
+        compact: Return unindented JSON (default: False)
+        ids_only: Return only profile ids and match scores (default: False)
+    """
+    await load_nlp()
+    criteria = SearchCriteria(
+        keyword=keyword,
+        location=location,
+        industry=industry,
+        title=title,
+        company=company,
+        partial_match=partial_match,
+        min_similarity=min_similarity
+    )
+
+    try:
+        local = search_local_profiles(criteria)
+    except sqlite3.Error:
+        local = []
+    source = "local"
+    if len(local) < min_results:
+        data = await search_profiles_until(criteria, min_results, 1, max_pages)
+        if data:
+            source = "local+api"
+            seen = {profile_key(profile) for _, profile in local}
+            for result in data["results"]:
+                profile = {name: value for name, value in result.items() if name != "match_score"}
+                if profile_key(profile) not in seen:
+                    local.append((result["match_score"], profile))
+            local.sort(key=lambda pair: pair[0], reverse=True)
+        elif not local:
+            return "Unable to search LinkedIn profiles."
+
+    data = {
+        "results": [
+            {**profile, "match_score": round(score, 1)}
+            for score, profile in local
+        ],
+        "source": source
+    }
+    return format_search_results(data, fields, compact, ids_only)
+
+def build_synonym_table(keywords: List[str], path: str) -> None:
+    """Precompute synonyms for keywords with spaCy and write them as a synonym table."""
+    table = {keyword: SearchCriteria(keyword)._get_synonyms(keyword) for keyword in keywords}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=2)
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    if len(sys.argv) > 2 and sys.argv[1] == "build-synonym-table":
+        # python linkedin.py build-synonym-table synonyms.json "seed investor" VC ...
+        build_synonym_table(sys.argv[3:], sys.argv[2])
+    else:
+        mcp.run(transport="stdio")
\ No newline at end of file
@@ -1,7 +1,25 @@
+import asyncio
+import json
+import os
+import threading
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
+import linkedin
 from linkedin import SearchCriteria, search_linkedin_profiles
 
+@pytest.fixture(autouse=True)
+def fresh_synonym_cache(monkeypatch):
+    monkeypatch.setattr(linkedin, "synonym_cache", linkedin.SynonymCache(128))
+
+@pytest.fixture(autouse=True)
+def tmp_response_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(linkedin, "RESPONSE_CACHE_PATH", str(tmp_path / "search_cache.sqlite3"))
+    monkeypatch.setattr(linkedin, "_response_cache", None)
+    monkeypatch.setattr(linkedin, "PROFILE_STORE_PATH", str(tmp_path / "profiles.sqlite3"))
+    monkeypatch.setattr(linkedin, "_profile_store", None)
+    yield
+    linkedin.close_stores()
+
 @pytest.fixture
 def mock_profile_data():
     return {
@@ -100,4 +118,282 @@ async def test_search_linkedin_profiles():
         mock_client.get.assert_called_once()
         assert result is not None
         assert len(result["results"]) == 1
-        assert result["results"][0]["full_name"] == "John Smith"
\ No newline at end of file
+        assert result["results"][0]["full_name"] == "John Smith"
+
+def test_synonym_table_without_spacy(tmp_path, monkeypatch):
+    import linkedin
+
+    table = tmp_path / "synonyms.json"
+    table.write_text('{"Seed Investor": ["angel investor", "early-stage investor"]}')
+    monkeypatch.setattr(linkedin, "SYNONYM_TABLE_PATH", str(table))
+    monkeypatch.setattr(linkedin, "_synonym_table", None)
+    monkeypatch.setattr(linkedin, "USE_SPACY", False)
+
+    criteria = SearchCriteria(keyword="seed investor")
+    assert sorted(criteria.synonyms) == ["angel investor", "early-stage investor"]
+    assert linkedin.get_nlp() is None
+
+
+def test_hardcoded_synonyms_without_spacy(monkeypatch):
+    import linkedin
+
+    monkeypatch.setattr(linkedin, "_synonym_table", {})
+    monkeypatch.setattr(linkedin, "USE_SPACY", False)
+
+    criteria = SearchCriteria(keyword="VC")
+    assert "venture capital" in criteria.synonyms
+
+
+def test_synonym_expansion_is_memoized(monkeypatch):
+    import linkedin
+
+    calls = []
+
+    def fake_expand(text):
+        calls.append(text)
+        return ["angel investor"]
+
+    monkeypatch.setattr(linkedin, "expand_synonyms", fake_expand)
+
+    SearchCriteria(keyword="Seed Investor")
+    criteria = SearchCriteria(keyword="  seed   investor ")
+    assert calls == ["seed investor"]
+    assert criteria.synonyms == ["angel investor"]
+
+
+def test_synonym_expansion_ignores_spelling(monkeypatch):
+    monkeypatch.setattr(linkedin, "_synonym_table", {})
+    monkeypatch.setattr(linkedin, "USE_SPACY", False)
+
+    assert sorted(SearchCriteria(keyword=" VC ").synonyms) == ["venture capital", "venture capitalist"]
+    assert sorted(SearchCriteria(keyword="VC").synonyms) == ["venture capital", "venture capitalist"]
+
+
+def test_synonym_expansion_does_not_mutate_hardcoded(monkeypatch):
+    import linkedin
+
+    monkeypatch.setattr(linkedin, "_synonym_table", {})
+    monkeypatch.setattr(linkedin, "USE_SPACY", False)
+
+    before = list(linkedin.HARDCODED_SYNONYMS["VC"])
+    SearchCriteria(keyword="VC").synonyms.append("mutated")
+    assert linkedin.HARDCODED_SYNONYMS["VC"] == before
+    assert "mutated" not in SearchCriteria(keyword="vc").synonyms
+
+
+def test_synonym_cache_persists_and_evicts(tmp_path):
+    import linkedin
+
+    path = str(tmp_path / "synonyms-cache.json")
+    cache = linkedin.SynonymCache(2, path)
+    cache.put("a", ["x"])
+    cache.put("b", ["y"])
+    cache.get("a")
+    cache.put("c", ["z"])
+    assert not os.path.exists(path)
+    cache.flush()
+
+    reloaded = linkedin.SynonymCache(2, path)
+    assert reloaded.get("a") == ["x"]
+    assert reloaded.get("b") is None
+    assert reloaded.get("c") == ["z"]
+
+
+def test_rank_profiles_scores_relevant_fields(mock_profile_data):
+    criteria = SearchCriteria(keyword="seed investor", min_similarity=70)
+    profiles = mock_profile_data["results"] + [
+        {"full_name": "Sam Lee", "title": "Software Engineer", "location": "Investor Street"}
+    ]
+
+    ranked = criteria.rank_profiles(profiles)
+    assert ranked[0][1]["full_name"] == "John Smith"
+    assert ranked[0][0] == 100.0
+    assert all(score >= 70 for score, _ in ranked)
+    assert [profile["full_name"] for _, profile in criteria.rank_profiles(profiles, top_k=1)] == ["John Smith"]
+
+
+def test_score_profiles_exact_match():
+    criteria = SearchCriteria(keyword="investor", partial_match=False)
+    scores = criteria.score_profiles([
+        {"title": "Senior Investor at Growth Fund"},
+        {"title": "Engineer", "full_name": "investor"},
+        {"title": "Engineer"},
+    ])
+    assert scores == [100.0, 100.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_search_profiles_until_dedupes_and_stops_early(monkeypatch):
+    pages = {
+        1: [{"profile_id": "1", "title": "Seed Investor"}, {"profile_id": "2", "title": "Plumber"}],
+        2: [{"profile_id": "1", "title": "Seed Investor"}, {"profile_id": "3", "title": "Seed Investor"}],
+        3: [{"profile_id": "4", "title": "Seed Investor"}],
+    }
+    requested = []
+
+    async def fake_fetch(criteria, page=1):
+        requested.append(page)
+        return {"results": pages.get(page, [])}
+
+    monkeypatch.setattr(linkedin, "fetch_profile_page", fake_fetch)
+    monkeypatch.setattr(linkedin, "PAGE_CONCURRENCY", 1)
+
+    criteria = SearchCriteria(keyword="seed investor")
+    result = await linkedin.search_profiles_until(criteria, target_count=2, max_pages=10)
+    assert [p["profile_id"] for p in result["results"]] == ["1", "3"]
+    assert requested == [1, 2]
+    assert result["next_page"] == 3
+
+    requested.clear()
+    result = await linkedin.search_profiles_until(criteria, target_count=10, max_pages=10)
+    assert requested == [1, 2, 3, 4]
+    assert len(result["results"]) == 3
+    assert result["next_page"] is None
+
+
+@pytest.mark.asyncio
+async def test_cached_search_reuses_fetch_across_similarity(mock_profile_data):
+    response = MagicMock()
+    response.json.return_value = mock_profile_data
+
+    with patch('httpx.AsyncClient.get', new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = response
+        strict = await search_linkedin_profiles(SearchCriteria(keyword="Seed Investor", min_similarity=100))
+        loose = await search_linkedin_profiles(SearchCriteria(keyword="seed  investor", min_similarity=50))
+
+    mock_get.assert_called_once()
+    assert [p["full_name"] for p in strict["results"]] == ["John Smith"]
+    assert len(loose["results"]) == 2
+
+
+def test_response_cache_expires_and_caps(tmp_path):
+    import linkedin
+
+    cache = linkedin.ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+
+    cache.ttl = 0
+    assert cache.get("c") is None
+    cache.close()
+
+
+def test_local_search_uses_inverted_index(mock_profile_data):
+    store = linkedin.get_profile_store()
+    store.add_profiles(mock_profile_data["results"] + [
+        {"full_name": "Sam Lee", "title": "Software Engineer", "location": "London, UK"}
+    ])
+    store.add_profiles([mock_profile_data["results"][0]])
+    assert store.count() == 3
+
+    ranked = linkedin.search_local_profiles(SearchCriteria(keyword="angel investor"))
+    assert ranked[0][1]["full_name"] == "Jane Doe"
+    assert "Sam Lee" not in [profile["full_name"] for _, profile in ranked]
+
+    london = linkedin.search_local_profiles(SearchCriteria(keyword="investor", location="london"))
+    assert [profile["full_name"] for _, profile in london] == ["John Smith"]
+
+
+def test_profile_candidates_keep_every_gram():
+    store = linkedin.get_profile_store()
+    store.add_profiles([{"full_name": "Zed Zhou", "title": "Zymurgist", "location": "York, UK"}])
+    # Well over SQLite's parameter limit, with every gram of the match
+    # sorting after the filler's
+    chars = "0123456789abcdefghijklmnopqrstuvwxy"
+    terms = [a + b for a in chars for b in chars] + ["zymurgist"]
+    assert [profile["full_name"] for profile in store.candidates(terms, 5)] == ["Zed Zhou"]
+
+
+@pytest.mark.asyncio
+async def test_local_first_search_falls_back_to_api(mock_profile_data, monkeypatch):
+    linkedin.get_profile_store().add_profiles([mock_profile_data["results"][0]])
+    calls = []
+
+    async def fake_until(criteria, target_count, start_page=1, max_pages=5):
+        calls.append(target_count)
+        return {"results": [{**p, "match_score": 90.0} for p in mock_profile_data["results"]]}
+
+    monkeypatch.setattr(linkedin, "search_profiles_until", fake_until)
+
+    local = json.loads(await linkedin.local_first_search_profiles("seed investor", min_results=1))
+    assert local["source"] == "local" and calls == []
+
+    merged = json.loads(await linkedin.local_first_search_profiles("investor", min_results=5))
+    assert merged["source"] == "local+api" and calls == [5]
+    assert sorted(p["full_name"] for p in merged["results"]) == ["Jane Doe", "John Smith"]
+
+
+def test_format_search_results_projection(mock_profile_data):
+    data = {
+        "results": [{**p, "match_score": 90.0, "profile_id": str(i)} for i, p in enumerate(mock_profile_data["results"])],
+        "next_page": 2
+    }
+
+    projected = json.loads(linkedin.format_search_results(data, fields=["full_name"]))
+    assert projected["results"][0] == {"full_name": "John Smith", "match_score": 90.0}
+    assert projected["next_page"] == 2
+
+    ids = json.loads(linkedin.format_search_results(data, ids_only=True, compact=True))
+    assert ids["results"] == [{"id": "0", "match_score": 90.0}, {"id": "1", "match_score": 90.0}]
+
+    compact = linkedin.format_search_results(data, compact=True)
+    assert "\n" not in compact and json.loads(compact) == data
+    assert "title" in data["results"][0]
+
+
+@pytest.mark.asyncio
+async def test_search_retries_rate_limited_requests(mock_profile_data, monkeypatch):
+    from mcp_common.ratelimit import RateLimiter
+
+    monkeypatch.setattr(linkedin, "search_limiter", RateLimiter(100, max_retries=2, backoff_base=0.01))
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+    ok = MagicMock(status_code=200)
+    ok.json.return_value = mock_profile_data
+
+    with patch('httpx.AsyncClient.get', new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = [throttled, ok]
+        result = await search_linkedin_profiles(SearchCriteria(keyword="seed investor"))
+
+    assert mock_get.call_count == 2
+    assert result["results"][0]["full_name"] == "John Smith"
+    stats = linkedin.search_limiter.stats()[linkedin.RAPIDAPI_HOST]
+    assert stats["retries"] == 1 and stats["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_profiles_until_reports_failed_page(monkeypatch):
+    async def fake_fetch(criteria, page=1):
+        # Let all three workers start before any page completes
+        await asyncio.sleep(0)
+        if page == 2:
+            return None
+        return {"results": [{"profile_id": str(page), "title": "Seed Investor"}]}
+
+    monkeypatch.setattr(linkedin, "fetch_profile_page", fake_fetch)
+    monkeypatch.setattr(linkedin, "PAGE_CONCURRENCY", 3)
+
+    result = await linkedin.search_profiles_until(SearchCriteria(keyword="seed investor"), target_count=10, max_pages=3)
+    assert result["pages_fetched"] == [1, 3]
+    assert result["failed_pages"] == [2]
+    assert result["next_page"] == 2
+    assert "error" in result
+
+
+@pytest.mark.asyncio
+async def test_tools_load_nlp_off_the_event_loop(monkeypatch):
+    loads = []
+
+    def fake_get_nlp():
+        if linkedin._nlp is None:
+            loads.append(threading.current_thread() is threading.main_thread())
+            linkedin._nlp = lambda text: []
+        return linkedin._nlp
+
+    monkeypatch.setattr(linkedin, "USE_SPACY", True)
+    monkeypatch.setattr(linkedin, "_nlp", None)
+    monkeypatch.setattr(linkedin, "get_nlp", fake_get_nlp)
+
+    await linkedin.local_first_search_profiles("seed investor", min_results=0)
+    assert loads == [False]
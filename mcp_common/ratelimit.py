@@ -0,0 +1,219 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+# Statuses that mean "slow down and try again"; other errors are returned as-is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class TokenBucket:
+    """Token bucket that spaces out request starts to a steady rate."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may start."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for the next few seconds."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted by AIMD.
+
+    Each success raises the limit by 1/limit (about one slot per round of
+    requests) up to maximum; each throttle halves it, down to minimum.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit / 2)
+
+def retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """Read a Retry-After header (seconds or HTTP date), falling back to default."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with jitter for the given retry attempt."""
+    return min(maximum, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+class HostLimit:
+    """Rate and concurrency state for one upstream host (or finer key)."""
+
+    def __init__(self, rate: float, max_concurrency: int):
+        self.bucket = TokenBucket(rate)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight
+        }
+
+class RateLimiter:
+    """Per-key token buckets, AIMD concurrency and jittered retries.
+
+    Keys are usually hosts, but callers can key more finely where the
+    upstream limits that way (e.g. per Airtable base). 429 and 5xx replies
+    shrink the key's concurrency and are retried after Retry-After or an
+    exponential backoff; a 429 also pauses the key's bucket so no other
+    request starts in the meantime. Calls that are not idempotent (POSTs)
+    are only retried after a 429, which means the request was not applied.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        throttle_wait: float | None = None
+    ):
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Pause after a 429 without Retry-After; None uses the backoff delay
+        self.throttle_wait = throttle_wait
+        self.limits: dict[Hashable, HostLimit] = {}
+
+    def limit_for(self, key: Hashable) -> HostLimit:
+        limit = self.limits.get(key)
+        if limit is None:
+            limit = self.limits[key] = HostLimit(self.rate, self.max_concurrency)
+        return limit
+
+    async def send(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[httpx.Response]],
+        idempotent: bool = True
+    ) -> httpx.Response:
+        """Run fn under key's limits, retrying throttled and failed attempts.
+
+        Returns the last response once retries run out; callers still check
+        its status. Non-idempotent calls are only retried after a 429.
+        Any other exception from fn is raised immediately.
+        """
+        limit = self.limit_for(key)
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            async with limit.concurrency:
+                await limit.bucket.acquire()
+                limit.requests += 1
+                try:
+                    response = await fn()
+                except httpx.TransportError:
+                    limit.concurrency.on_throttle()
+                    if last or not idempotent:
+                        raise
+                    response = None
+            if response is None:
+                # Back off outside the concurrency slot, as for a 5xx
+                limit.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                limit.concurrency.on_success()
+                return response
+
+            limit.throttled += 1
+            limit.concurrency.on_throttle()
+            # A 5xx may arrive after the upstream already applied the
+            # request, so only a 429 is safe to resend when not idempotent
+            if last or (not idempotent and response.status_code != 429):
+                return response
+            limit.retries += 1
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            if response.status_code == 429:
+                limit.bucket.pause(retry_after_seconds(
+                    response, self.throttle_wait if self.throttle_wait is not None else delay
+                ))
+            else:
+                await asyncio.sleep(retry_after_seconds(response, delay))
+        return response
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """Send a request through client, limited per URL host."""
+        return await self.send(
+            urlsplit(url).netloc,
+            lambda: client.request(method, url, **kwargs),
+            idempotent=method.upper() != "POST"
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {str(key): limit.stats() for key, limit in self.limits.items()}
@@ -0,0 +1,39 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key starts the work; callers arriving while it
+    is still running await the same result (or exception) instead of
+    issuing their own request. Results are not cached once the call ends.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or join the call already running for key."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one caller being cancelled doesn't cancel the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, Any]:
+        """Counters describing how much work was coalesced."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
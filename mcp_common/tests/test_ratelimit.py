@@ -0,0 +1,162 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from mcp_common.ratelimit import AdaptiveConcurrency, RateLimiter, TokenBucket, retry_after_seconds
+
+def responses(*statuses, headers=None):
+    """An fn for RateLimiter.send that replies with each status in turn."""
+    replies = iter(statuses)
+    sent = []
+
+    async def fn():
+        sent.append(1)
+        return httpx.Response(next(replies), headers=headers)
+
+    return fn, sent
+
+def test_throttle_halves_limit_down_to_minimum():
+    concurrency = AdaptiveConcurrency(8, minimum=2)
+    concurrency.on_throttle()
+    assert concurrency.limit == 4
+    concurrency.on_throttle()
+    concurrency.on_throttle()
+    assert concurrency.limit == 2
+
+def test_success_recovers_limit_additively():
+    concurrency = AdaptiveConcurrency(8)
+    concurrency.on_throttle()
+    concurrency.on_throttle()
+    assert concurrency.limit == 2
+    # One round of requests at the current limit adds about one slot
+    concurrency.on_success()
+    concurrency.on_success()
+    assert concurrency.limit == pytest.approx(2.9)
+    for _ in range(100):
+        concurrency.on_success()
+    assert concurrency.limit == 8
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_a_free_slot():
+    concurrency = AdaptiveConcurrency(2)
+    concurrency.on_throttle()
+    await concurrency.acquire()
+    waiter = asyncio.create_task(concurrency.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    await concurrency.release()
+    await asyncio.wait_for(waiter, 1)
+    assert concurrency.in_flight == 1
+
+@pytest.mark.asyncio
+async def test_bucket_spaces_requests_to_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+def test_retry_after_seconds_formats():
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "3"}), 1) == 3
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < retry_after_seconds(httpx.Response(429, headers={"Retry-After": later}), 1) <= 30
+    assert retry_after_seconds(httpx.Response(429), 1.5) == 1.5
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "soon"}), 1.5) == 1.5
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_the_key():
+    limiter = RateLimiter(1000, backoff_base=0.001)
+    fn, sent = responses(429, 200, headers={"Retry-After": "0.2"})
+
+    start = time.monotonic()
+    response = await limiter.send("host", fn)
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 0.2
+    assert len(sent) == 2
+
+    stats = limiter.stats()["host"]
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 1
+    # Halved by the 429, then nudged back up by the success
+    assert 4 < stats["concurrency_limit"] < 5
+
+@pytest.mark.asyncio
+async def test_pause_holds_back_other_requests_for_the_key_only():
+    limiter = RateLimiter(1000, backoff_base=0.001)
+    limiter.limit_for("host").bucket.pause(0.2)
+
+    start = time.monotonic()
+    await limiter.send("other", responses(200)[0])
+    assert time.monotonic() - start < 0.1
+    await limiter.send("host", responses(200)[0])
+    assert time.monotonic() - start >= 0.2
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    limiter = RateLimiter(1000, max_retries=2, backoff_base=0.001)
+    fn, sent = responses(503, 503, 503, 200)
+    response = await limiter.send("host", fn)
+    assert response.status_code == 503
+    assert len(sent) == 3
+
+@pytest.mark.asyncio
+async def test_non_idempotent_calls_retry_only_on_429():
+    limiter = RateLimiter(1000, backoff_base=0.001, throttle_wait=0)
+    fn, sent = responses(502, 200)
+    assert (await limiter.send("host", fn, idempotent=False)).status_code == 502
+    assert len(sent) == 1
+
+    fn, sent = responses(429, 200)
+    assert (await limiter.send("host", fn, idempotent=False)).status_code == 200
+    assert len(sent) == 2
+
+@pytest.mark.asyncio
+async def test_transport_errors_retry_only_when_idempotent():
+    limiter = RateLimiter(1000, backoff_base=0.001)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("reset")
+        return httpx.Response(200)
+
+    assert (await limiter.send("host", flaky)).status_code == 200
+    assert len(attempts) == 2
+
+    attempts.clear()
+    with pytest.raises(httpx.ConnectError):
+        await limiter.send("host", flaky, idempotent=False)
+
+@pytest.mark.asyncio
+async def test_request_keys_by_host_and_posts_are_not_idempotent():
+    statuses = iter([502, 200])
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(next(statuses))))
+    limiter = RateLimiter(1000, backoff_base=0.001)
+
+    response = await limiter.request(client, "POST", "https://api.example.com/items")
+    assert response.status_code == 502
+    assert list(limiter.stats()) == ["api.example.com"]
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_transport_error_backoff_frees_the_slot():
+    limiter = RateLimiter(1000, max_concurrency=1, backoff_base=0.5, backoff_max=0.5)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("reset")
+        return httpx.Response(200)
+
+    retrying = asyncio.create_task(limiter.send("host", flaky))
+    await asyncio.sleep(0.01)
+    start = time.monotonic()
+    assert (await limiter.send("host", responses(200)[0])).status_code == 200
+    assert time.monotonic() - start < 0.2
+    assert (await retrying).status_code == 200
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from mcp_common.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_flight():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await gate.wait()
+        return "result"
+
+    waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert flight.stats() == {"calls": 1, "coalesced": 2, "in_flight": 1}
+
+    gate.set()
+    assert await asyncio.gather(*waiters) == ["result"] * 3
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_results_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert await flight.do("key", fetch) == 1
+    assert await flight.do("key", fetch) == 2
+
+@pytest.mark.asyncio
+async def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+
+    async def fetch(value):
+        await gate.wait()
+        return value
+
+    first = asyncio.create_task(flight.do("a", lambda: fetch("a")))
+    second = asyncio.create_task(flight.do("b", lambda: fetch("b")))
+    await asyncio.sleep(0)
+    gate.set()
+    assert await asyncio.gather(first, second) == ["a", "b"]
+    assert flight.stats()["coalesced"] == 0
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+
+    async def fetch():
+        await gate.wait()
+        raise ValueError("upstream failed")
+
+    waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(2)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+
+    async def fetch():
+        await gate.wait()
+        return "result"
+
+    cancelled = asyncio.create_task(flight.do("key", fetch))
+    remaining = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+    assert await remaining == "result"
+    assert cancelled.cancelled()
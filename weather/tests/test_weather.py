@@ -0,0 +1,167 @@
+import math
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+import weather
+from mcp_common.ratelimit import RateLimiter
+from mcp_common.singleflight import SingleFlight
+
+ALERTS_URL = "https://api.weather.gov/alerts/active"
+
+def square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+def alert(alert_id, event, geometry=None):
+    return {"id": alert_id, "geometry": geometry, "properties": {"id": alert_id, "event": event}}
+
+@pytest.fixture
+def nws(monkeypatch):
+    """Route NWS requests to a handler set by the test; returns the requests made."""
+    requests = []
+    route = {}
+
+    def handler(request):
+        requests.append(request)
+        return route["handler"](request)
+
+    monkeypatch.setattr(weather, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(weather, "validator_cache", weather.ValidatorCache(16))
+    monkeypatch.setattr(weather, "nws_flight", SingleFlight())
+    monkeypatch.setattr(weather, "nws_limiter", RateLimiter(1000, max_retries=0))
+    route["requests"] = requests
+    return route
+
+def test_cache_ttl_prefers_max_age():
+    headers = httpx.Headers({"Cache-Control": "public, s-maxage=10, max-age=600"})
+    assert weather.cache_ttl_from_headers(headers, 5) == 600
+
+def test_cache_ttl_ignores_shared_cache_lifetime():
+    headers = httpx.Headers({"Cache-Control": "s-maxage=10"})
+    assert weather.cache_ttl_from_headers(headers, 5) == 5
+
+def test_cache_ttl_no_store_and_expires():
+    assert weather.cache_ttl_from_headers(httpx.Headers({"Cache-Control": "no-store, max-age=60"}), 5) == 0
+    date = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    headers = httpx.Headers({
+        "Date": format_datetime(date, usegmt=True),
+        "Expires": format_datetime(date.replace(hour=13), usegmt=True)
+    })
+    assert weather.cache_ttl_from_headers(headers, 5) == 3600
+    assert weather.cache_ttl_from_headers(httpx.Headers({"Expires": "0"}), 5) == 0
+
+def test_grid_cache_writes_file_only_on_flush(tmp_path):
+    path = tmp_path / "grid.json"
+    cache = weather.GridPointCache(8, str(path), flush_interval=3600)
+    cache.put("1,2", {"gridId": "LWX"}, 60)
+    assert not path.exists()
+
+    cache.flush()
+    reloaded = weather.GridPointCache(8, str(path))
+    reloaded.load()
+    assert reloaded.get("1,2") == {"gridId": "LWX"}
+
+@pytest.mark.asyncio
+async def test_not_modified_reuses_parsed_body(nws):
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json={"features": []}, headers={"ETag": '"v1"'})
+
+    nws["handler"] = handler
+    first = await weather.make_nws_request(ALERTS_URL)
+    second = await weather.make_nws_request(ALERTS_URL)
+
+    assert second is first
+    assert [r.headers.get("If-None-Match") for r in nws["requests"]] == [None, '"v1"']
+
+@pytest.mark.asyncio
+async def test_not_modified_after_eviction_refetches(nws):
+    def handler(request):
+        if request.headers.get("If-None-Match"):
+            # Another request pushes this URL out of the cache mid-flight
+            weather.validator_cache._entries.clear()
+            return httpx.Response(304)
+        return httpx.Response(200, json={"features": []}, headers={"ETag": '"v1"'})
+
+    nws["handler"] = handler
+    await weather.make_nws_request(ALERTS_URL)
+
+    assert await weather.make_nws_request(ALERTS_URL) == {"features": []}
+    assert [r.headers.get("If-None-Match") for r in nws["requests"]] == [None, '"v1"', None]
+
+@pytest.mark.asyncio
+async def test_alert_feed_changes_since(nws):
+    responses = iter([
+        [alert("a", "Flood"), alert("b", "Heat")],
+        [alert("a", "Flood Warning"), alert("c", "Wind")],
+        [alert("c", "Wind")],
+    ])
+    nws["handler"] = lambda request: httpx.Response(200, json={"features": next(responses)})
+    feed = weather.AlertFeed(ALERTS_URL, poll_interval=60, changelog_size=3)
+
+    await feed.refresh()
+    assert [(seq, change) for seq, change, _ in feed.changes_since(0)] == [(1, "added"), (2, "added")]
+
+    await feed.refresh()
+    changes = feed.changes_since(2)
+    assert sorted(change for _, change, _ in changes) == ["added", "expired", "updated"]
+    assert feed.sequence == 5
+
+    # The log only holds the last three changes
+    assert feed.changes_since(0) is None
+    assert len(feed.changes_since(2)) == 3
+    assert feed.changes_since(feed.sequence) == []
+    # A cursor from before a restart is ahead of the feed
+    assert feed.changes_since(feed.sequence + 10) is None
+
+    await feed.refresh()
+    assert [change for _, change, _ in feed.changes_since(5)] == ["expired"]
+
+def test_spatial_index_query():
+    index = weather.AlertSpatialIndex(cell_size=1.0)
+    donut = alert("donut", "Flood", {
+        "type": "Polygon",
+        "coordinates": [square(-78, 38, -76, 40), square(-77.5, 38.5, -77.2, 38.8)]
+    })
+    wide = alert("wide", "Heat", {"type": "MultiPolygon", "coordinates": [[square(-90, 30, -80, 35)]]})
+    features = [donut, wide]
+    index.build([(f, weather.geometry_polygons(f["geometry"])) for f in features], sequence=7)
+
+    assert index.sequence == 7
+    assert index.query(39.5, -77) == [donut]
+    # Inside the hole
+    assert index.query(38.6, -77.3) == []
+    # Several cells away from the wide polygon's first vertex
+    assert index.query(33.5, -84.5) == [wide]
+    assert index.query(45, -100) == []
+
+def test_parse_valid_time():
+    start, hours = weather.parse_valid_time("2025-01-01T00:00:00+00:00/P1W")
+    assert start == datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    assert hours == 168
+    assert weather.parse_valid_time("2025-01-01T00:00:00+00:00/P1DT2H")[1] == 26
+    assert weather.parse_valid_time("2025-01-01T00:00:00+00:00/PT30M")[1] == 1
+    with pytest.raises(ValueError):
+        weather.parse_valid_time("2025-01-01T00:00:00+00:00/P1Y")
+
+def test_forecast_series_from_gridpoint():
+    data = {"properties": {
+        "temperature": {"values": [
+            {"validTime": "2025-01-01T00:00:00+00:00/PT2H", "value": 0},
+            {"validTime": "2025-01-01T02:00:00+00:00/PT1H", "value": None},
+            {"validTime": "2025-01-01T03:00:00+00:00/P1Y", "value": 50},
+        ]},
+        "windSpeed": {"values": [{"validTime": "2025-01-01T01:00:00+00:00/PT2H", "value": 16.09344}]},
+    }}
+    series = weather.ForecastSeries.from_gridpoint(data)
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    assert list(series.time) == [start, start + 3600, start + 7200]
+    assert list(series.temperature)[:2] == [32.0, 32.0]
+    assert math.isnan(series.temperature[2])
+    assert math.isnan(series.wind_speed[0])
+    assert list(series.wind_speed)[1:] == pytest.approx([10.0, 10.0])
+    assert all(math.isnan(value) for value in series.precipitation)
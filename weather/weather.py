@@ -1,27 +1,706 @@
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from importlib.util import find_spec
 from typing import Any
+import asyncio
+import json
+import os
+import re
+import time
 import httpx
 from mcp.server.fastmcp import FastMCP
 
-# Initialize FastMCP server
-mcp = FastMCP("weather")
+from mcp_common.ratelimit import RateLimiter
+from mcp_common.singleflight import SingleFlight
 
 # Constants
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "weather-app/1.0"
 
+# Connection pool settings, tunable from the environment
+HTTP_MAX_CONNECTIONS = int(os.getenv("WEATHER_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("WEATHER_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("WEATHER_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("WEATHER_HTTP_TIMEOUT", "30"))
+HTTP2_ENABLED = os.getenv("WEATHER_HTTP2", "").lower() in ("1", "true", "yes")
+
+# /points grid lookup cache settings
+GRID_CACHE_SIZE = int(os.getenv("WEATHER_GRID_CACHE_SIZE", "1024"))
+GRID_CACHE_DEFAULT_TTL = float(os.getenv("WEATHER_GRID_CACHE_TTL", "86400"))
+GRID_CACHE_PATH = os.getenv("WEATHER_GRID_CACHE_PATH")
+# Minimum seconds between writes of the cache file; it is also written on shutdown
+GRID_CACHE_FLUSH_INTERVAL = float(os.getenv("WEATHER_GRID_CACHE_FLUSH_INTERVAL", "30"))
+
+# Conditional GET validator cache size (number of URLs)
+VALIDATOR_CACHE_SIZE = int(os.getenv("WEATHER_VALIDATOR_CACHE_SIZE", "256"))
+
+# Maximum upstream requests in flight for one batch forecast call
+BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "8"))
+
+# api.weather.gov limits are unpublished; these stay well inside them
+NWS_REQUESTS_PER_SECOND = float(os.getenv("WEATHER_REQUESTS_PER_SECOND", "10"))
+NWS_MAX_CONCURRENCY = int(os.getenv("WEATHER_MAX_CONCURRENCY", "8"))
+NWS_MAX_RETRIES = int(os.getenv("WEATHER_MAX_RETRIES", "3"))
+
+# Incremental alert feed settings
+ALERT_POLL_INTERVAL = float(os.getenv("WEATHER_ALERT_POLL_INTERVAL", "60"))
+ALERT_CHANGELOG_SIZE = int(os.getenv("WEATHER_ALERT_CHANGELOG_SIZE", "5000"))
+
+# Grid cell size, in degrees, of the alert polygon spatial index
+ALERT_INDEX_CELL_SIZE = float(os.getenv("WEATHER_ALERT_INDEX_CELL_SIZE", "1.0"))
+
+# Fields of a /points response that later requests need
+GRID_POINT_FIELDS = (
+    "gridId", "gridX", "gridY",
+    "forecast", "forecastHourly", "forecastGridData",
+    "forecastZone", "county"
+)
+
+_http_client: httpx.AsyncClient | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared NWS client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "application/geo+json"
+            },
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            http2=HTTP2_ENABLED and find_spec("h2") is not None
+        )
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared NWS client and release its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def cache_ttl_from_headers(headers: httpx.Headers, default: float) -> float:
+    """Work out how long a response may be cached from its HTTP headers."""
+    cache_control = headers.get("Cache-Control", "")
+    directives = {}
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    # s-maxage is for shared caches; this one is private to the server
+    if directives.get("max-age", "").isdigit():
+        return float(directives["max-age"])
+
+    if "Expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["Expires"])
+            date = parsedate_to_datetime(headers["Date"]) if "Date" in headers else None
+            now = date.timestamp() if date else time.time()
+            return max(0.0, expires.timestamp() - now)
+        except (TypeError, ValueError):
+            return 0.0
+    return default
+
+class GridPointCache:
+    """LRU cache of /points grid lookups with per-entry expiry.
+
+    Entries are keyed on coordinates rounded to the 4 decimal places NWS
+    uses and can optionally be persisted to a JSON file between runs. Puts
+    only mark the cache dirty; the file is rewritten at most once per
+    flush_interval and by flush() on shutdown.
+    """
+
+    def __init__(self, max_entries: int, path: str | None = None, flush_interval: float = 30.0):
+        self.max_entries = max_entries
+        self.path = path
+        self.flush_interval = flush_interval
+        self.dirty = False
+        self._flushed_at = time.monotonic()
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def key(latitude: float, longitude: float) -> str:
+        return f"{round(latitude, 4)},{round(longitude, 4)}"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.dirty = True
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the cache file if anything changed since the last write."""
+        if self.dirty:
+            self.save()
+            self.dirty = False
+        self._flushed_at = time.monotonic()
+
+    def load(self) -> None:
+        """Load unexpired entries from the cache file, if one is configured."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, (expires_at, value) in stored.items():
+            if expires_at > now:
+                self._entries[key] = (expires_at, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Write the cache to its file, if one is configured."""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+class ValidatorCache:
+    """Per-URL store of ETag/Last-Modified validators and parsed bodies.
+
+    Used to send conditional requests and serve the already-parsed body on
+    a 304 Not Modified. Bodies are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[dict[str, str], dict[str, Any], httpx.Headers]] = OrderedDict()
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        """Headers that make a request for url conditional."""
+        entry = self._entries.get(url)
+        return dict(entry[0]) if entry else {}
+
+    def get(self, url: str) -> tuple[dict[str, Any], httpx.Headers] | None:
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        self._entries.move_to_end(url)
+        return entry[1], entry[2]
+
+    def put(self, url: str, data: dict[str, Any], headers: httpx.Headers) -> None:
+        validators = {}
+        if "ETag" in headers:
+            validators["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        if not validators or self.max_entries <= 0:
+            self._entries.pop(url, None)
+            return
+        self._entries[url] = (validators, data, headers)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+grid_cache = GridPointCache(GRID_CACHE_SIZE, GRID_CACHE_PATH, GRID_CACHE_FLUSH_INTERVAL)
+validator_cache = ValidatorCache(VALIDATOR_CACHE_SIZE)
+nws_flight = SingleFlight()
+nws_limiter = RateLimiter(NWS_REQUESTS_PER_SECOND, NWS_MAX_CONCURRENCY, NWS_MAX_RETRIES)
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Own the shared HTTP client for the lifetime of the server."""
+    grid_cache.load()
+    get_http_client()
+    try:
+        yield
+    finally:
+        await alert_feed.stop()
+        await stop_alert_index()
+        await close_http_client()
+        grid_cache.flush()
+
+# Initialize FastMCP server
+mcp = FastMCP("weather", lifespan=server_lifespan)
+
+async def fetch_nws(url: str) -> tuple[dict[str, Any], httpx.Headers] | None:
+    """Fetch an NWS URL, returning the parsed body and response headers.
+
+    Concurrent fetches of the same URL share a single upstream request.
+    """
+    return await nws_flight.do(url, lambda: _fetch_nws(url))
+
+async def _fetch_nws(url: str) -> tuple[dict[str, Any], httpx.Headers] | None:
+    """Fetch an NWS URL without coalescing.
+
+    Requests are made conditional when validators for the URL are known;
+    a 304 reply is answered from the stored body without re-parsing.
+    """
+    client = get_http_client()
+    try:
+        response = await nws_limiter.request(client, "GET", url, headers=validator_cache.request_headers(url))
+        if response.status_code == 304:
+            cached = validator_cache.get(url)
+            if cached is not None:
+                data, headers = cached
+                headers = httpx.Headers(headers)
+                headers.update(response.headers)
+                return data, headers
+            # Validators were evicted mid-flight; fetch unconditionally
+            response = await nws_limiter.request(client, "GET", url)
+        response.raise_for_status()
+        data = response.json()
+        validator_cache.put(url, data, response.headers)
+        return data, response.headers
+    except Exception:
+        return None
+
 async def make_nws_request(url: str) -> dict[str, Any] | None:
     """Make a request to the NWS API with proper error handling."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
+    result = await fetch_nws(url)
+    return result[0] if result else None
+
+async def get_grid_point(latitude: float, longitude: float) -> dict[str, Any] | None:
+    """Resolve a location to its NWS grid point, using the grid cache."""
+    key = GridPointCache.key(latitude, longitude)
+    grid_point = grid_cache.get(key)
+    if grid_point is not None:
+        return grid_point
+
+    result = await fetch_nws(f"{NWS_API_BASE}/points/{key}")
+    if not result or "properties" not in result[0]:
+        return None
+
+    data, headers = result
+    grid_point = {
+        field: data["properties"].get(field) for field in GRID_POINT_FIELDS
+    }
+    grid_cache.put(key, grid_point, cache_ttl_from_headers(headers, GRID_CACHE_DEFAULT_TTL))
+    return grid_point
+
+class AlertFeed:
+    """In-memory index of active national alerts with a change log.
+
+    Each refresh diffs the active-alerts feed against the index and appends
+    added, updated and expired alerts to a bounded log under increasing
+    sequence numbers, so callers can ask for changes since a cursor.
+    """
+
+    def __init__(self, url: str, poll_interval: float, changelog_size: int):
+        self.url = url
+        self.poll_interval = poll_interval
+        self.alerts: dict[str, dict] = {}
+        self.changes: deque[tuple[int, str, dict]] = deque(maxlen=changelog_size)
+        self.sequence = 0
+        self.last_refresh = 0.0
+        self._last_data: dict[str, Any] | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def refresh(self) -> bool:
+        """Poll the feed once and record what changed."""
+        async with self._lock:
+            data = await make_nws_request(self.url)
+            if not data or "features" not in data:
+                return False
+            self.last_refresh = time.monotonic()
+            # A 304 hands back the same parsed body, so nothing changed
+            if data is self._last_data:
+                return True
+            self._last_data = data
+
+            current = {
+                feature.get("id") or feature["properties"].get("id"): feature
+                for feature in data["features"]
+            }
+            for alert_id, feature in current.items():
+                previous = self.alerts.get(alert_id)
+                if previous is None:
+                    self._record("added", feature)
+                elif previous["properties"] != feature["properties"]:
+                    self._record("updated", feature)
+            for alert_id in self.alerts.keys() - current.keys():
+                self._record("expired", self.alerts[alert_id])
+            self.alerts = current
+            return True
+
+    def _record(self, change: str, feature: dict) -> None:
+        self.sequence += 1
+        self.changes.append((self.sequence, change, feature))
+
+    async def ensure_fresh(self) -> None:
+        """Start the poller on first use and make sure the index is current."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        if time.monotonic() - self.last_refresh >= self.poll_interval:
+            await self.refresh()
+
+    def changes_since(self, cursor: int) -> list[tuple[int, str, dict]] | None:
+        """Changes after cursor, or None if the log does not cover the cursor.
+
+        That includes cursors ahead of the current sequence, which were
+        issued before the server restarted.
+        """
+        if cursor > self.sequence:
+            return None
+        if self.changes and cursor < self.changes[0][0] - 1:
+            return None
+        return [entry for entry in self.changes if entry[0] > cursor]
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self.refresh()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+alert_feed = AlertFeed(f"{NWS_API_BASE}/alerts/active", ALERT_POLL_INTERVAL, ALERT_CHANGELOG_SIZE)
+
+def alert_in_state(feature: dict, state: str) -> bool:
+    """Check whether an alert covers any zone in the given state."""
+    ugc_codes = feature["properties"].get("geocode", {}).get("UGC", [])
+    return any(code[:2].upper() == state.upper() for code in ugc_codes)
+
+def point_in_ring(longitude: float, latitude: float, ring: list[list[float]]) -> bool:
+    """Ray-casting test of a point against one GeoJSON linear ring."""
+    inside = False
+    x1, y1 = ring[-1][0], ring[-1][1]
+    for x2, y2, *_ in ring:
+        if (y2 > latitude) != (y1 > latitude):
+            if longitude < (x1 - x2) * (latitude - y2) / (y1 - y2) + x2:
+                inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+def geometry_polygons(geometry: dict | None) -> list[list[list[list[float]]]]:
+    """Flatten a GeoJSON geometry into a list of polygons (lists of rings)."""
+    if not geometry:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return list(geometry["coordinates"])
+    if geometry["type"] == "GeometryCollection":
+        return [p for g in geometry.get("geometries", []) for p in geometry_polygons(g)]
+    return []
+
+class AlertSpatialIndex:
+    """Uniform grid index over alert polygons for point lookups.
+
+    Each polygon is registered in every grid cell its bounding box touches,
+    so a query only runs exact point-in-polygon tests on the polygons of a
+    single cell.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.sequence = -1
+        # False while zone geometries for some alerts are still being fetched
+        self.complete = False
+        self._cells: dict[tuple[int, int], list[int]] = {}
+        self._entries: list[tuple[dict, tuple[float, float, float, float], list]] = []
+
+    def _cell(self, longitude: float, latitude: float) -> tuple[int, int]:
+        return int(longitude // self.cell_size), int(latitude // self.cell_size)
+
+    def build(self, alerts: list[tuple[dict, list]], sequence: int) -> None:
+        """Replace the index with (feature, polygons) pairs."""
+        cells: dict[tuple[int, int], list[int]] = {}
+        entries = []
+        for feature, polygons in alerts:
+            for polygon in polygons:
+                outer = polygon[0]
+                xs = [point[0] for point in outer]
+                ys = [point[1] for point in outer]
+                bbox = (min(xs), min(ys), max(xs), max(ys))
+                entries.append((feature, bbox, polygon))
+                min_cell = self._cell(bbox[0], bbox[1])
+                max_cell = self._cell(bbox[2], bbox[3])
+                for cx in range(min_cell[0], max_cell[0] + 1):
+                    for cy in range(min_cell[1], max_cell[1] + 1):
+                        cells.setdefault((cx, cy), []).append(len(entries) - 1)
+        self._cells = cells
+        self._entries = entries
+        self.sequence = sequence
+
+    def query(self, latitude: float, longitude: float) -> list[dict]:
+        """Alerts whose polygons contain the point, without duplicates."""
+        matches = {}
+        for i in self._cells.get(self._cell(longitude, latitude), []):
+            feature, (min_x, min_y, max_x, max_y), polygon = self._entries[i]
+            if id(feature) in matches:
+                continue
+            if not (min_x <= longitude <= max_x and min_y <= latitude <= max_y):
+                continue
+            if point_in_ring(longitude, latitude, polygon[0]) and not any(
+                point_in_ring(longitude, latitude, hole) for hole in polygon[1:]
+            ):
+                matches[id(feature)] = feature
+        return list(matches.values())
+
+alert_index = AlertSpatialIndex(ALERT_INDEX_CELL_SIZE)
+# Zone geometries rarely change, so they are kept for the server's lifetime
+zone_geometries: dict[str, dict | None] = {}
+_alert_index_lock = asyncio.Lock()
+# Index upkeep starts with the first point query, so servers that only use
+# the alert feed never fetch zone geometries
+_alert_index_task: asyncio.Task | None = None
+_alert_index_wake: asyncio.Event | None = None
+
+async def get_zone_geometry(zone_url: str) -> dict | None:
+    """Fetch (once) the geometry of an NWS forecast or county zone."""
+    if zone_url not in zone_geometries:
+        data = await make_nws_request(zone_url)
+        if data is None:
+            return None
+        zone_geometries[zone_url] = data.get("geometry")
+    return zone_geometries[zone_url]
+
+def alert_zone_urls(features: list[dict]) -> set[str]:
+    """Zones covered by alerts that have no polygon of their own."""
+    return {
+        zone_url
+        for feature in features if not feature.get("geometry")
+        for zone_url in feature["properties"].get("affectedZones", [])
     }
-    async with httpx.AsyncClient() as client:
+
+def build_alert_index() -> None:
+    """Rebuild the spatial index from the feed and the zones fetched so far.
+
+    Makes no requests; the index is marked incomplete while zones of
+    zone-based alerts are still missing.
+    """
+    features = list(alert_feed.alerts.values())
+    alerts = []
+    for feature in features:
+        if feature.get("geometry"):
+            polygons = geometry_polygons(feature["geometry"])
+        else:
+            polygons = [
+                polygon
+                for zone_url in feature["properties"].get("affectedZones", [])
+                for polygon in geometry_polygons(zone_geometries.get(zone_url))
+            ]
+        alerts.append((feature, polygons))
+    alert_index.build(alerts, alert_feed.sequence)
+    alert_index.complete = alert_zone_urls(features) <= zone_geometries.keys()
+
+async def refresh_alert_index() -> None:
+    """Fetch missing zone geometries and rebuild the index.
+
+    Runs from the index upkeep task, so point queries never wait on zones.
+    """
+    async with _alert_index_lock:
+        if alert_index.sequence == alert_feed.sequence and alert_index.complete:
+            return
+        zone_urls = alert_zone_urls(list(alert_feed.alerts.values())) - zone_geometries.keys()
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def bounded(zone_url):
+            async with semaphore:
+                return await get_zone_geometry(zone_url)
+
+        await asyncio.gather(*(bounded(zone_url) for zone_url in zone_urls))
+        build_alert_index()
+
+async def _maintain_alert_index(wake: asyncio.Event) -> None:
+    while True:
+        wake.clear()
         try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
+            await refresh_alert_index()
         except Exception:
+            pass
+        try:
+            await asyncio.wait_for(wake.wait(), alert_feed.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+def wake_alert_index() -> None:
+    """Start index upkeep, or have it catch up with the feed now."""
+    global _alert_index_task, _alert_index_wake
+    if _alert_index_task is None or _alert_index_task.done():
+        _alert_index_wake = asyncio.Event()
+        _alert_index_task = asyncio.create_task(_maintain_alert_index(_alert_index_wake))
+    _alert_index_wake.set()
+
+async def stop_alert_index() -> None:
+    global _alert_index_task
+    if _alert_index_task is not None:
+        _alert_index_task.cancel()
+        try:
+            await _alert_index_task
+        except asyncio.CancelledError:
+            pass
+        _alert_index_task = None
+
+ISO_DURATION = re.compile(r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+
+def parse_valid_time(valid_time: str) -> tuple[float, int]:
+    """Split a gridpoint validTime ("start/duration") into epoch start and hours.
+
+    Raises ValueError for a start or duration that cannot be parsed.
+    """
+    start, _, duration = valid_time.partition("/")
+    match = ISO_DURATION.fullmatch(duration)
+    if match is None:
+        raise ValueError(f"Unsupported duration: {duration!r}")
+    weeks, days, hours, minutes, seconds = (int(x or 0) for x in match.groups())
+    minutes += (seconds + 59) // 60
+    hours += (weeks * 7 + days) * 24 + (minutes + 59) // 60
+    return datetime.fromisoformat(start).timestamp(), max(1, hours)
+
+def parse_wind_speed(wind_speed: str) -> float:
+    """Take the upper bound of an hourly windSpeed string like "5 to 10 mph"."""
+    numbers = re.findall(r"\d+(?:\.\d+)?", wind_speed or "")
+    return float(numbers[-1]) if numbers else float("nan")
+
+class ForecastSeries:
+    """Hourly forecast stored as parallel array-backed columns.
+
+    Temperatures are in °F, wind speeds in mph and precipitation
+    probabilities in percent; missing values are NaN.
+    """
+
+    def __init__(self):
+        self.time = array("d")
+        self.temperature = array("d")
+        self.wind_speed = array("d")
+        self.precipitation = array("d")
+
+    @classmethod
+    def from_hourly(cls, data: dict[str, Any]) -> "ForecastSeries":
+        """Build from a /forecast/hourly response."""
+        series = cls()
+        for period in data["properties"]["periods"]:
+            temperature = float(period["temperature"])
+            if period.get("temperatureUnit") == "C":
+                temperature = temperature * 9 / 5 + 32
+            precipitation = (period.get("probabilityOfPrecipitation") or {}).get("value")
+            series.time.append(datetime.fromisoformat(period["startTime"]).timestamp())
+            series.temperature.append(temperature)
+            series.wind_speed.append(parse_wind_speed(period.get("windSpeed")))
+            series.precipitation.append(float("nan") if precipitation is None else float(precipitation))
+        return series
+
+    @classmethod
+    def from_gridpoint(cls, data: dict[str, Any]) -> "ForecastSeries":
+        """Build from a raw /gridpoints response, expanded to hourly samples."""
+        props = data["properties"]
+
+        def hourly(layer: str, convert) -> dict[float, float]:
+            values = {}
+            for entry in props.get(layer, {}).get("values", []):
+                if entry["value"] is None:
+                    continue
+                try:
+                    start, hours = parse_valid_time(entry["validTime"])
+                except ValueError:
+                    continue
+                for hour in range(hours):
+                    values[start + hour * 3600] = convert(entry["value"])
+            return values
+
+        temperature = hourly("temperature", lambda c: c * 9 / 5 + 32)
+        wind_speed = hourly("windSpeed", lambda kmh: kmh / 1.609344)
+        precipitation = hourly("probabilityOfPrecipitation", float)
+
+        series = cls()
+        nan = float("nan")
+        for timestamp in sorted(temperature.keys() | wind_speed.keys() | precipitation.keys()):
+            series.time.append(timestamp)
+            series.temperature.append(temperature.get(timestamp, nan))
+            series.wind_speed.append(wind_speed.get(timestamp, nan))
+            series.precipitation.append(precipitation.get(timestamp, nan))
+        return series
+
+    def window(self, start: float, hours: int) -> tuple[int, int]:
+        """Index range of samples in [start, start + hours)."""
+        return bisect_left(self.time, start), bisect_left(self.time, start + hours * 3600)
+
+    @staticmethod
+    def stats(column: array, lo: int, hi: int) -> tuple[float, float, float] | None:
+        """Min, max and mean of a column slice, ignoring missing values."""
+        values = [v for v in column[lo:hi] if v == v]
+        if not values:
             return None
+        return min(values), max(values), sum(values) / len(values)
+
+    def first_exceeding(self, column: array, threshold: float, lo: int, hi: int) -> float | None:
+        """Time of the first sample in the slice at or above threshold."""
+        for i in range(lo, hi):
+            if column[i] >= threshold:
+                return self.time[i]
+        return None
+
+# Parsed series keyed by URL, reused while the upstream body is unchanged
+_series_cache: OrderedDict[str, tuple[dict[str, Any], ForecastSeries]] = OrderedDict()
+
+async def get_forecast_series(url: str, source: str) -> ForecastSeries | None:
+    """Fetch a forecast time series, converting it to columns only when it changes."""
+    data = await make_nws_request(url)
+    if not data or "properties" not in data:
+        return None
+    cached = _series_cache.get(url)
+    if cached is not None and cached[0] is data:
+        _series_cache.move_to_end(url)
+        return cached[1]
+
+    if source == "gridpoint":
+        series = ForecastSeries.from_gridpoint(data)
+    else:
+        series = ForecastSeries.from_hourly(data)
+    _series_cache[url] = (data, series)
+    while len(_series_cache) > VALIDATOR_CACHE_SIZE:
+        _series_cache.popitem(last=False)
+    return series
+
+def format_forecast(periods: list[dict]) -> str:
+    """Format forecast periods into a readable string."""
+    forecasts = []
+    for period in periods[:5]:  # Only show next 5 periods
+        forecast = f"""
+{period['name']}:
+Temperature: {period['temperature']}°{period['temperatureUnit']}
+Wind: {period['windSpeed']} {period['windDirection']}
+Forecast: {period['detailedForecast']}
+"""
+        forecasts.append(forecast)
+
+    return "\n---\n".join(forecasts)
 
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
@@ -53,6 +732,77 @@ async def get_alerts(state: str) -> str:
     alerts = [format_alert(feature) for feature in data["features"]]
     return "\n---\n".join(alerts)
 
+@mcp.tool()
+async def get_alerts_for_point(latitude: float, longitude: float) -> str:
+    """Get weather alerts affecting a specific location.
+
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+    """
+    await alert_feed.ensure_fresh()
+    if not alert_feed.last_refresh:
+        return "Unable to fetch alerts or no alerts found."
+
+    # Answer from what is known now; zones are fetched in the background
+    if alert_index.sequence != alert_feed.sequence:
+        build_alert_index()
+    if not alert_index.complete or _alert_index_task is None:
+        wake_alert_index()
+    note = "" if alert_index.complete else (
+        "\nNote: boundaries of some zone-based alerts are still loading, so they may be missing."
+    )
+
+    features = alert_index.query(latitude, longitude)
+    if not features:
+        return "No active alerts for this location." + note
+
+    alerts = [format_alert(feature) for feature in features]
+    return "\n---\n".join(alerts) + note
+
+@mcp.tool()
+async def get_alert_changes(cursor: int = 0, state: str | None = None) -> str:
+    """Get weather alerts added, updated or expired since a cursor.
+
+    Call with cursor 0 first, then pass back the cursor from each response
+    to receive only what changed since the previous call. A response marked
+    "Resync" lists every active alert instead of changes.
+
+    Args:
+        cursor: Cursor returned by the previous call (0 for all active alerts)
+        state: Optional two-letter US state code to filter on (e.g. CA, NY)
+    """
+    await alert_feed.ensure_fresh()
+    if not alert_feed.last_refresh:
+        return "Unable to fetch alerts."
+
+    changes = alert_feed.changes_since(cursor) if cursor > 0 else None
+    resync = changes is None
+    if resync:
+        # First call, or the change log does not cover the cursor:
+        # send every active alert
+        changes = [(0, "added", feature) for feature in alert_feed.alerts.values()]
+
+    if state:
+        changes = [entry for entry in changes if alert_in_state(entry[2], state)]
+
+    header = f"Cursor: {alert_feed.sequence}"
+    if resync:
+        header += "\nResync: full list of active alerts; discard any alerts held from earlier calls."
+        if not changes:
+            return f"{header}\nNo active alerts."
+    elif not changes:
+        return f"{header}\nNo alert changes since cursor {cursor}."
+
+    sections = []
+    for _, change, feature in changes:
+        if change == "expired":
+            props = feature["properties"]
+            sections.append(f"\n[EXPIRED]\nEvent: {props.get('event', 'Unknown')}\nArea: {props.get('areaDesc', 'Unknown')}\n")
+        else:
+            sections.append(f"\n[{change.upper()}]{format_alert(feature)}")
+    return f"{header}\n" + "\n---\n".join(sections)
+
 @mcp.tool()
 async def get_forecast(latitude: float, longitude: float) -> str:
     """Get weather forecast for a location.
@@ -62,32 +812,136 @@ async def get_forecast(latitude: float, longitude: float) -> str:
         longitude: Longitude of the location
     """
     # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    grid_point = await get_grid_point(latitude, longitude)
 
-    if not points_data:
+    if not grid_point or not grid_point["forecast"]:
         return "Unable to fetch forecast data for this location."
 
     # Get the forecast URL from the points response
-    forecast_url = points_data["properties"]["forecast"]
+    forecast_url = grid_point["forecast"]
     forecast_data = await make_nws_request(forecast_url)
 
     if not forecast_data:
         return "Unable to fetch detailed forecast."
 
     # Format the periods into a readable forecast
-    periods = forecast_data["properties"]["periods"]
-    forecasts = []
-    for period in periods[:5]:  # Only show next 5 periods
-        forecast = f"""
-{period['name']}:
-Temperature: {period['temperature']}°{period['temperatureUnit']}
-Wind: {period['windSpeed']} {period['windDirection']}
-Forecast: {period['detailedForecast']}
-"""
-        forecasts.append(forecast)
+    return format_forecast(forecast_data["properties"]["periods"])
 
-    return "\n---\n".join(forecasts)
+@mcp.tool()
+async def get_forecast_summary(
+    latitude: float,
+    longitude: float,
+    hours: int = 24,
+    precipitation_threshold: float = 50,
+    source: str = "hourly"
+) -> str:
+    """Summarize the hourly forecast for a location over a time window.
+
+    Returns min/max/mean temperature, wind and precipitation probability
+    instead of individual forecast periods.
+
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        hours: Length of the window starting now, in hours (default: 24)
+        precipitation_threshold: Report the first hour precipitation probability reaches this percentage (default: 50)
+        source: "hourly" for the hourly forecast or "gridpoint" for raw gridpoint data
+    """
+    if source not in ("hourly", "gridpoint"):
+        return 'Invalid source; use "hourly" or "gridpoint".'
+
+    grid_point = await get_grid_point(latitude, longitude)
+    url_field = "forecastGridData" if source == "gridpoint" else "forecastHourly"
+    if not grid_point or not grid_point[url_field]:
+        return "Unable to fetch forecast data for this location."
+
+    series = await get_forecast_series(grid_point[url_field], source)
+    if series is None:
+        return "Unable to fetch detailed forecast."
+
+    # Include the hour already in progress
+    now = time.time() - 3600
+    lo, hi = series.window(now, hours)
+    if lo >= hi:
+        return "No forecast data available for this window."
+
+    def fmt_time(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+    def fmt_stats(label: str, column: array, unit: str) -> str:
+        result = series.stats(column, lo, hi)
+        if result is None:
+            return f"{label}: no data"
+        low, high, mean = result
+        return f"{label}: min {low:.0f}{unit}, max {high:.0f}{unit}, mean {mean:.1f}{unit}"
+
+    first_wet = series.first_exceeding(series.precipitation, precipitation_threshold, lo, hi)
+    return "\n".join([
+        f"Window: {fmt_time(series.time[lo])} to {fmt_time(series.time[hi - 1])} ({hi - lo} hours)",
+        fmt_stats("Temperature", series.temperature, "°F"),
+        fmt_stats("Wind", series.wind_speed, " mph"),
+        fmt_stats("Precipitation probability", series.precipitation, "%"),
+        f"First hour with precipitation probability >= {precipitation_threshold:g}%: "
+        + (fmt_time(first_wet) if first_wet is not None else "none in window")
+    ])
+
+@mcp.tool()
+async def get_forecasts(locations: list[tuple[float, float]]) -> str:
+    """Get weather forecasts for several locations in one call.
+
+    Locations that fall in the same NWS grid cell share a single forecast
+    request.
+
+    Args:
+        locations: List of [latitude, longitude] pairs
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    # Resolve every location to its grid point concurrently
+    grid_points = await asyncio.gather(*(
+        bounded(get_grid_point(latitude, longitude))
+        for latitude, longitude in locations
+    ))
+
+    # Fetch each distinct grid cell's forecast only once
+    forecast_urls = {}
+    for grid_point in grid_points:
+        if grid_point and grid_point["forecast"]:
+            cell = (grid_point["gridId"], grid_point["gridX"], grid_point["gridY"])
+            forecast_urls.setdefault(cell, grid_point["forecast"])
+
+    cells = list(forecast_urls)
+    responses = await asyncio.gather(*(
+        bounded(make_nws_request(forecast_urls[cell])) for cell in cells
+    ))
+    forecasts_by_cell = dict(zip(cells, responses))
+
+    sections = []
+    for (latitude, longitude), grid_point in zip(locations, grid_points):
+        if not grid_point or not grid_point["forecast"]:
+            body = "Unable to fetch forecast data for this location."
+        else:
+            cell = (grid_point["gridId"], grid_point["gridX"], grid_point["gridY"])
+            forecast_data = forecasts_by_cell[cell]
+            if not forecast_data:
+                body = "Unable to fetch detailed forecast."
+            else:
+                body = format_forecast(forecast_data["properties"]["periods"])
+        sections.append(f"=== Forecast for {latitude}, {longitude} ===\n{body}")
+
+    return "\n\n".join(sections)
+
+@mcp.resource("weather://stats")
+def get_request_stats() -> str:
+    """Upstream request counters, including coalesced and retried requests."""
+    return json.dumps({
+        "nws_requests": nws_flight.stats(),
+        "rate_limits": nws_limiter.stats()
+    }, indent=2)
 
 if __name__ == "__main__":
     # Initialize and run the server